@@ -2,16 +2,46 @@ import sys
 import os 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+import argparse
 from load import DataLoader
+from snapshots import SnapshotStore
+from reporting import format_rupiah, format_percent, export_query
 import pandas as pd
 
-def main():
-    warehouse_db = os.path.join(
-        os.path.dirname(__file__),
-        'data',
-        'warehouse',
-        'ecommerce_warehouse.db'
-    )
+
+def query_params(loader, name, filters):
+    # Only pass the filters a query declares; None keeps its default.
+    accepted = set(loader.queries[name]['params']) | {'as_of'}
+    return {key: value for key, value in filters.items() if key in accepted and value is not None}
+
+WAREHOUSE_DB = os.path.join(
+    os.path.dirname(__file__),
+    'data',
+    'warehouse',
+    'ecommerce_warehouse.db'
+)
+SNAPSHOT_DIR = os.path.join(os.path.dirname(WAREHOUSE_DB), 'snapshots')
+
+def make_loader(as_of=None):
+    # Only reports for an earlier run need the snapshot store.
+    if as_of is None:
+        return DataLoader(WAREHOUSE_DB)
+    return DataLoader(WAREHOUSE_DB, snapshots=SnapshotStore(WAREHOUSE_DB, SNAPSHOT_DIR))
+
+def export(name, output, fmt=None, filters=None):
+    # Full, unformatted result of one named query, written batch by batch
+    # so even unlimited reports never sit in memory at once.
+    loader = make_loader((filters or {}).get('as_of'))
+    try:
+        params = query_params(loader, name, filters or {})
+        rows = export_query(loader, name, output, fmt=fmt, **params)
+        print(f"Exported {rows:,} rows of '{name}' to {output}")
+    finally:
+        loader.close()
+
+def main(filters=None):
+    filters = filters or {}
+    warehouse_db = WAREHOUSE_DB
 
     if not os.path.exists(warehouse_db):
         print("\n" + "="*70)
@@ -24,31 +54,20 @@ def main():
         return
 
 
-    loader = DataLoader(warehouse_db)
+    loader = make_loader(filters.get('as_of'))
 
     print("\n" + "="*70)
     print("E-COMMERCE ANALYTICS DASHBOARD")
+    if filters.get('as_of'):
+        print(f"As of run: {filters['as_of']}")
     print("="*70)
 
     print("\n 📊 TOP 5 PRODUCTS BY REVENUE")
     print("-"*70)
 
-    query = """
-        SELECT 
-            product_name,
-            category,
-            SUM(total_item_price) as total_revenue,
-            SUM(quantity) as total_quantity,
-            COUNT(DISTINCT order_id) as total_orders
-        FROM fact_sales
-        WHERE order_status = 'delivered'
-        GROUP BY product_name, category
-        ORDER BY total_revenue DESC
-        LIMIT 5
-    """
     try:
-        result = loader.execute_query(query)
-        result['total_revenue'] = result['total_revenue'].apply(lambda x: f"Rp {x:,.0f}" if pd.notna(x) else "Rp 0")
+        result = loader.run_query('top_products', **query_params(loader, 'top_products', filters))
+        result['total_revenue'] = format_rupiah(result['total_revenue'])
         print(result.to_string(index=False))
     except Exception as e:
         print(f" Erorr: {str(e)}")
@@ -57,22 +76,10 @@ def main():
     print("\n 📊 SALES BY CATEGORY")
     print("-"*70)
 
-    query = """
-        SELECT
-            category,
-            COUNT(DISTINCT order_id) as total_orders,
-            SUM(quantity) as total_items,
-            SUM(total_item_price) as total_revenue,
-            AVG(total_item_price) AS avg_order_value
-        FROM fact_sales
-        WHERE order_status = 'delivered'
-        GROUP BY category
-        ORDER BY total_revenue DESC
-    """
     try:
-        result = loader.execute_query(query)
-        result['total_revenue'] = result['total_revenue'].apply(lambda x: f"Rp {x:,.0f}" if pd.notna(x) else "Rp 0")
-        result['avg_order_value'] = result['avg_order_value'].apply(lambda x: f"Rp {x:,.0f}" if pd.notna(x) else "Rp 0")
+        result = loader.run_query('sales_by_category', **query_params(loader, 'sales_by_category', filters))
+        result['total_revenue'] = format_rupiah(result['total_revenue'])
+        result['avg_order_value'] = format_rupiah(result['avg_order_value'])
         print(result.to_string(index=False))
     except Exception as e:
         print(f" Erorr: {str(e)}")
@@ -80,21 +87,9 @@ def main():
     print("\n 📊 SALES BY CITY")
     print("-"*70)
 
-    query = """
-        SELECT
-            city,
-            COUNT(DISTINCT customer_id) as unique_customers,
-            COUNT(DISTINCT order_id) as total_orders,
-            SUM(total_item_price) as total_revenue
-        FROM fact_sales
-        WHERE order_status = 'delivered'
-        GROUP BY city
-        ORDER BY total_revenue DESC
-        LIMIT 5
-    """
     try:
-        result =loader.execute_query(query)
-        result['total_revenue'] = result['total_revenue'].apply(lambda x: f"Rp {x:,.0f}" if pd.notna(x) else "Rp 0")
+        result = loader.run_query('sales_by_city', **query_params(loader, 'sales_by_city', filters))
+        result['total_revenue'] = format_rupiah(result['total_revenue'])
         print(result.to_string(index=False))
     except Exception as e:
         print(f" Erorr: {str(e)}")
@@ -102,21 +97,9 @@ def main():
     print("\n 📊 TOP 5 CUSTOMERS BY SPENDING")
     print("-"*70)
 
-    query = """
-        SELECT
-            customer_name,
-            city,
-            COUNT(DISTINCT order_id) as total_orders,
-            SUM(total_item_price) as total_spent
-        FROM fact_sales
-        WHERE order_status = 'delivered'
-        GROUP BY customer_id, customer_name, city
-        ORDER BY total_spent DESC
-        LIMIT 5
-    """
     try:
-        result = loader.execute_query(query)
-        result['total_spent'] = result['total_spent'].apply(lambda x: f"Rp {x:,.0f}" if pd.notna(x) else "Rp 0")
+        result = loader.run_query('top_customers', **query_params(loader, 'top_customers', filters))
+        result['total_spent'] = format_rupiah(result['total_spent'])
         print(result.to_string(index=False))
     except Exception as e:
         print(f" Erorr: {str(e)}")
@@ -125,19 +108,9 @@ def main():
     print("\n 📊 ORDER STATUS DISTRIBUTION")
     print("-"*70)
 
-    query = """
-        SELECT
-            order_status,
-            COUNT(DISTINCT order_id) as order_count,
-            ROUND(COUNT(DISTINCT order_id) * 100.0 / 
-            (SELECT COUNT(DISTINCT order_id) FROM fact_sales), 2) as percentage
-        FROM fact_sales
-        GROUP BY order_status
-        ORDER BY order_count DESC
-    """
     try:
-        result = loader.execute_query(query)
-        result['percentage'] = result['percentage'].apply(lambda x: f"{x}%" if pd.notna(x) else "0%")
+        result = loader.run_query('order_status_distribution', **query_params(loader, 'order_status_distribution', filters))
+        result['percentage'] = format_percent(result['percentage'])
         print(result.to_string(index=False))
     except Exception as e:
         print(f" Erorr: {str(e)}")
@@ -145,20 +118,9 @@ def main():
     print("\n 📊 DAILY SALES TREND")
     print("-"*70)
 
-    query = """
-        SELECT
-            DATE(order_date) as date,
-            COUNT(DISTINCT order_id) as orders,
-            SUM(total_item_price) as revenue
-        FROM fact_sales
-        WHERE order_status = 'delivered'
-        GROUP BY DATE(order_date)
-        ORDER BY date DESC
-        LIMIT 10
-    """
     try:
-        result = loader.execute_query(query)
-        result['revenue'] = result['revenue'].apply(lambda x: f"Rp {x:,.0f}" if pd.notna(x) else "Rp 0")
+        result = loader.run_query('daily_sales_trend', **query_params(loader, 'daily_sales_trend', filters))
+        result['revenue'] = format_rupiah(result['revenue'])
         print(result.to_string(index=False))
     except Exception as e:
         print(f" Erorr: {str(e)}")
@@ -166,18 +128,8 @@ def main():
     print("\n 📊 OVERALL SUMMARY METRICS")
     print("-"*70)
 
-    query = """
-        SELECT
-            COUNT(DISTINCT order_id) as total_orders,
-            COUNT(DISTINCT customer_id) as total_customers,
-            COUNT(DISTINCT product_id) as total_products,
-            SUM(total_item_price) as total_revenue,
-            AVG(total_item_price) as avg_order_value
-        FROM fact_sales
-        WHERE order_status = 'delivered'
-    """
     try: 
-        result = loader.execute_query(query)
+        result = loader.run_query('summary_metrics', **query_params(loader, 'summary_metrics', filters))
         if result.empty or len(result) == 0:
             print(" Tidak ada data")
         else:
@@ -208,8 +160,25 @@ def main():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="E-commerce analytics dashboard")
+    parser.add_argument('--status', dest='order_status', help="Order status to report on (default: delivered)")
+    parser.add_argument('--start-date', help="First order date to include (YYYY-MM-DD)")
+    parser.add_argument('--end-date', help="Last order date to include (YYYY-MM-DD)")
+    parser.add_argument('--limit', type=int, help="Rows to show for the top-N reports")
+    parser.add_argument('--as-of', metavar='RUN_ID', help="Report on the warehouse as a past pipeline run loaded it")
+    parser.add_argument('--export', metavar='QUERY', help="Export one named query instead of printing the dashboard")
+    parser.add_argument('--output', help="Export file; the format follows the extension (.csv, .parquet, .json, .jsonl)")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'json'], help="Export format, overriding the extension")
+    args = parser.parse_args()
+
+    filters = {key: getattr(args, key) for key in ('order_status', 'start_date', 'end_date', 'limit', 'as_of')}
     try:
-        main()
+        if args.export:
+            if not args.output:
+                parser.error("--export requires --output")
+            export(args.export, args.output, fmt=args.format, filters=filters)
+        else:
+            main(filters)
     except Exception as e:
         print(f"\n Error: {str(e)}")
         print("Make sure you've run the ETL first: python run_pipeline.py")
\ No newline at end of file
@@ -0,0 +1,212 @@
+import sys
+import os
+import json
+import time
+import logging
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from src.extract import DataExtractor
+from src.transform import DataTransformer
+from src.load import DataLoader
+from src.metrics import get_peak_rss_mb, count_rows
+from src.sharding import ShardedTransformer
+from src.compression import COMPRESSION_EXTENSIONS, compress_file
+from src.queries import ANALYTICS_QUERIES
+from benchmarks.synthetic_data import SyntheticDataGenerator
+from config.config import BENCHMARK_DATA_DIR, BENCHMARK_RESULTS_DIR
+
+
+logger = logging.getLogger(__name__)
+
+class BenchmarkRunner:
+    def __init__(self, data_dir, seed=42, trace_memory=False, shard_workers=None, compressions=None):
+        self.data_dir = data_dir
+        self.seed = seed
+        self.trace_memory = trace_memory
+        self.shard_workers = shard_workers or []
+        self.compressions = compressions or []
+        self.results = []
+
+    def time_stage(self, n_rows, stage, func, *args, input_bytes=None):
+        if self.trace_memory:
+            tracemalloc.start()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        result = func(*args)
+
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        peak_alloc_mb = None
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_alloc_mb = round(peak / 1024 / 1024, 2)
+
+        rows_out = count_rows(result)
+        record = {
+            'rows': n_rows,
+            'stage': stage,
+            'wall_seconds': round(wall, 4),
+            'cpu_seconds': round(cpu, 4),
+            'peak_alloc_mb': peak_alloc_mb,
+            'peak_rss_mb': get_peak_rss_mb(),
+            'rows_out': rows_out,
+            'rows_per_sec': round(n_rows / wall, 1) if wall > 0 else None
+        }
+        if input_bytes is not None:
+            record['input_mb'] = round(input_bytes / 1024 / 1024, 2)
+        self.results.append(record)
+        logger.info("[%11s rows] %-35s %9.3fs  rows_out=%s", f"{n_rows:,}", stage, wall, rows_out)
+        return result
+
+    def prepare_data(self, n_rows):
+        scale_dir = os.path.join(self.data_dir, f"rows_{n_rows}_seed_{self.seed}")
+        marker = os.path.join(scale_dir, '_SUCCESS')
+        if not os.path.exists(marker):
+            generator = SyntheticDataGenerator(n_rows, seed=self.seed)
+            self.time_stage(n_rows, 'generate', generator.generate_all, scale_dir)
+            open(marker, 'w').close()
+        return scale_dir
+
+    def prepare_compressed(self, scale_dir, extension):
+        codec_dir = os.path.join(scale_dir, extension.lstrip('.'))
+        marker = os.path.join(codec_dir, '_SUCCESS')
+        if not os.path.exists(marker):
+            os.makedirs(codec_dir, exist_ok=True)
+            for file_name in DataExtractor.SOURCE_FILES.values():
+                compress_file(
+                    os.path.join(scale_dir, file_name),
+                    os.path.join(codec_dir, file_name + extension),
+                    COMPRESSION_EXTENSIONS[extension]
+                )
+            open(marker, 'w').close()
+        return codec_dir
+
+    def input_size(self, directory):
+        return sum(
+            os.path.getsize(path)
+            for paths in DataExtractor(directory).get_source_paths().values()
+            for path in paths
+        )
+
+    def run_scale(self, n_rows):
+        scale_dir = self.prepare_data(n_rows)
+
+        extractor = DataExtractor(scale_dir)
+        raw_data = self.time_stage(
+            n_rows, 'extract_all', extractor.extract_all, input_bytes=self.input_size(scale_dir)
+        )
+
+        for extension in self.compressions:
+            codec_dir = self.prepare_compressed(scale_dir, extension)
+            for stream in (True, False):
+                mode = 'stream' if stream else 'inline'
+                compressed = DataExtractor(codec_dir, stream_decompression=stream)
+                self.time_stage(
+                    n_rows, f"extract_all[{extension.lstrip('.')},{mode}]", compressed.extract_all,
+                    input_bytes=self.input_size(codec_dir)
+                )
+
+        transformer = DataTransformer()
+        transformed = self.time_stage(n_rows, 'transform_all', transformer.transform_all, raw_data)
+        self.time_stage(
+            n_rows, 'create_fact_sales', transformer.create_fact_sales,
+            transformed['orders'], transformed['order_items'],
+            transformed['customers'], transformed['products']
+        )
+
+        for n_workers in self.shard_workers:
+            sharded = ShardedTransformer(n_workers=n_workers)
+            self.time_stage(n_rows, f"transform_all_sharded[w={n_workers}]", sharded.transform_all, raw_data)
+
+        db_path = os.path.join(scale_dir, 'benchmark_warehouse.db')
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        loader = DataLoader(db_path)
+        self.time_stage(n_rows, 'load_all', loader.load_all, transformed)
+        self.time_stage(n_rows, 'create_indexes', loader.create_indexes)
+
+        for name in ANALYTICS_QUERIES:
+            self.time_stage(n_rows, f"query:{name}", loader.run_query, name)
+        loader.close()
+
+    def build_report(self):
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'seed': self.seed,
+            'environment': {
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count()
+            },
+            'results': self.results
+        }
+
+    def save(self, results_dir):
+        os.makedirs(results_dir, exist_ok=True)
+        path = os.path.join(results_dir, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, 'w') as f:
+            json.dump(self.build_report(), f, indent=2)
+        logger.info("Benchmark results saved to %s", path)
+        return path
+
+
+def compare_results(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    previous = {(r['rows'], r['stage']): r for r in baseline['results']}
+    print(f"\n=== COMPARISON WITH {baseline_path} ===")
+    print(f"{'rows':>12}  {'stage':35s} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for record in current:
+        old = previous.get((record['rows'], record['stage']))
+        if old is None or not old['wall_seconds']:
+            continue
+        ratio = record['wall_seconds'] / old['wall_seconds']
+        print(
+            f"{record['rows']:>12,}  {record['stage']:35s} "
+            f"{old['wall_seconds']:>9.3f}s {record['wall_seconds']:>9.3f}s {ratio:>6.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling benchmark for the ETL pipeline")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="Order item row counts to benchmark (10K up to 100M)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default=BENCHMARK_DATA_DIR)
+    parser.add_argument('--results-dir', default=BENCHMARK_RESULTS_DIR)
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Record tracemalloc peak per stage (slower)")
+    parser.add_argument('--shard-workers', type=int, nargs='*', default=[],
+                        help="Also time ShardedTransformer.transform_all with these worker counts, e.g. 1 2 4 8")
+    parser.add_argument('--compression', nargs='*', default=[], choices=list(COMPRESSION_EXTENSIONS),
+                        help="Also time extract_all on compressed copies of the inputs, e.g. .gz .zst .bz2")
+    parser.add_argument('--compare', help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    for noisy in ['src.extract', 'src.transform', 'src.load', 'src.cache', 'src.sharding', 'src.compression', 'benchmarks.synthetic_data']:
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    runner = BenchmarkRunner(
+        args.data_dir,
+        seed=args.seed,
+        trace_memory=args.trace_memory,
+        shard_workers=args.shard_workers,
+        compressions=args.compression
+    )
+    for n_rows in args.rows:
+        runner.run_scale(n_rows)
+    runner.save(args.results_dir)
+
+    if args.compare:
+        compare_results(runner.results, args.compare)
@@ -0,0 +1,192 @@
+import pandas as pd
+import numpy as np
+import os
+import zlib
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+FIRST_NAMES = ['budi', 'siti', 'ahmad', 'dewi', 'rina', 'agus', 'putri', 'eko', 'wulan', 'hendra', 'maya', 'rizky']
+LAST_NAMES = ['santoso', 'nurhaliza', 'wijaya', 'lestari', 'pratama', 'saputra', 'kusuma', 'hidayat', 'siregar']
+CITIES = ['jakarta', 'bandung', 'surabaya', 'medan', 'semarang', 'makassar', 'yogyakarta', 'denpasar', 'palembang', 'malang']
+CATEGORIES = ['Electronics', 'Fashion', 'Home', 'Beauty', 'Sports', 'Books', 'Toys', 'Groceries']
+PRODUCT_WORDS = ['laptop', 'phone', 'sneakers', 'jacket', 'lamp', 'serum', 'racket', 'novel', 'puzzle', 'coffee']
+ORDER_STATUSES = ['delivered', 'shipped', 'processing', 'cancelled', 'returned']
+ORDER_STATUS_WEIGHTS = [0.6, 0.15, 0.12, 0.08, 0.05]
+
+
+class SyntheticDataGenerator:
+    def __init__(self, n_rows, seed=42, chunk_size=1_000_000,
+                 duplicate_rate=0.01, dirty_rate=0.005, skew=1.3):
+        self.n_order_items = int(n_rows)
+        self.n_orders = max(1, self.n_order_items // 2)
+        self.n_customers = max(100, self.n_order_items // 50)
+        self.n_products = max(50, self.n_order_items // 2000)
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.duplicate_rate = duplicate_rate
+        self.dirty_rate = dirty_rate
+        self.skew = skew
+        self.start_date = np.datetime64('2024-01-01')
+        self.n_days = 365
+        logger.info(
+            "SyntheticDataGenerator initialized: %s order items, %s orders, %s customers, %s products",
+            self.n_order_items, self.n_orders, self.n_customers, self.n_products
+        )
+
+    def _rng(self, table, chunk_index):
+        # One stream per (table, chunk) so every table is reproducible on its
+        # own for a given seed and chunk_size.
+        return np.random.default_rng([self.seed, zlib.crc32(table.encode()), chunk_index])
+
+    def _skewed_index(self, rng, n, size):
+        return (rng.zipf(self.skew, size) - 1) % n
+
+    def _dirty_mask(self, rng, size, rate=None):
+        return rng.random(size) < (self.dirty_rate if rate is None else rate)
+
+    def _random_case(self, rng, values):
+        values = pd.Series(values, dtype=object)
+        mode = rng.integers(0, 3, len(values))
+        values[mode == 1] = values[mode == 1].str.upper()
+        values[mode == 2] = values[mode == 2].str.title()
+        return values
+
+    def _add_duplicates(self, rng, df):
+        n_dup = int(len(df) * self.duplicate_rate)
+        if n_dup == 0:
+            return df
+        return pd.concat([df, df.iloc[rng.integers(0, len(df), n_dup)]], ignore_index=True)
+
+    def _chunks(self, total):
+        for chunk_index, start in enumerate(range(0, total, self.chunk_size)):
+            yield chunk_index, start, min(start + self.chunk_size, total)
+
+    def generate_customers(self, chunk_index, start, stop):
+        rng = self._rng('customers', chunk_index)
+        n = stop - start
+        ids = np.arange(start, stop)
+
+        first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), n)]
+        last = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), n)]
+        name = pd.Series(first + ' ' + last, dtype=object)
+
+        email = ' ' + first + '.' + last + ids.astype(str).astype(object) + '@email.com'
+        email[self._dirty_mask(rng, n, 0.02)] = None
+
+        dates = (self.start_date - rng.integers(1, 3 * self.n_days, n)).astype(str).astype(object)
+        dates[self._dirty_mask(rng, n)] = 'not-a-date'
+
+        df = pd.DataFrame({
+            'customer_id': pd.Series(ids).map('CUST{:07d}'.format),
+            'customer_name': self._random_case(rng, name),
+            'email': email,
+            'city': self._random_case(rng, np.array(CITIES, dtype=object)[self._skewed_index(rng, len(CITIES), n)]),
+            'registration_date': dates
+        })
+        df.loc[self._dirty_mask(rng, n), 'customer_id'] = None
+        return self._add_duplicates(rng, df)
+
+    def generate_products(self, chunk_index, start, stop):
+        rng = self._rng('products', chunk_index)
+        n = stop - start
+        ids = np.arange(start, stop)
+
+        words = np.array(PRODUCT_WORDS, dtype=object)[rng.integers(0, len(PRODUCT_WORDS), n)]
+        category = ' ' + np.array(CATEGORIES, dtype=object)[self._skewed_index(rng, len(CATEGORIES), n)]
+        category[self._dirty_mask(rng, n, 0.02)] = None
+
+        df = pd.DataFrame({
+            'product_id': pd.Series(ids).map('PROD{:06d}'.format),
+            'product_name': self._random_case(rng, words + ' ' + ids.astype(str).astype(object)),
+            'category': category,
+            'price': rng.integers(10, 20_000, n) * 1000,
+            'stock': rng.integers(0, 500, n)
+        })
+        return self._add_duplicates(rng, df)
+
+    def generate_orders(self, chunk_index, start, stop):
+        rng = self._rng('orders', chunk_index)
+        n = stop - start
+        ids = np.arange(start, stop)
+
+        customer_idx = self._skewed_index(rng, self.n_customers, n)
+        customer_id = pd.Series(customer_idx).map('CUST{:07d}'.format).to_numpy(dtype=object)
+        orphan = self._dirty_mask(rng, n)
+        customer_id[orphan] = 'CUST9999999'
+        customer_id[self._dirty_mask(rng, n)] = None
+
+        # Orders arrive in date order with a few dates per chunk, like daily exports.
+        day = (ids * self.n_days) // max(self.n_orders, 1)
+        dates = (self.start_date + day).astype(str).astype(object)
+        dates[self._dirty_mask(rng, n)] = 'invalid'
+
+        status = np.array(ORDER_STATUSES, dtype=object)[
+            rng.choice(len(ORDER_STATUSES), n, p=ORDER_STATUS_WEIGHTS)
+        ]
+        status = self._random_case(rng, status)
+        padded = self._dirty_mask(rng, n, 0.05)
+        status[padded] = status[padded] + '  '
+        status[self._dirty_mask(rng, n)] = None
+
+        amount = rng.integers(10, 5_000, n).astype(float) * 1000
+        negative = self._dirty_mask(rng, n)
+        amount[negative] = -amount[negative]
+
+        df = pd.DataFrame({
+            'order_id': pd.Series(ids).map('ORD{:09d}'.format),
+            'customer_id': customer_id,
+            'order_date': dates,
+            'order_status': status,
+            'total_amount': amount
+        })
+        df.loc[self._dirty_mask(rng, n), 'order_id'] = None
+        return self._add_duplicates(rng, df)
+
+    def generate_order_items(self, chunk_index, start, stop):
+        rng = self._rng('order_items', chunk_index)
+        n = stop - start
+        ids = np.arange(start, stop)
+
+        order_idx = (ids * self.n_orders) // self.n_order_items
+        product_idx = self._skewed_index(rng, self.n_products, n)
+        product_id = pd.Series(product_idx).map('PROD{:06d}'.format).to_numpy(dtype=object)
+        product_id[self._dirty_mask(rng, n)] = 'PROD999999'
+
+        quantity = rng.integers(1, 6, n)
+        negative = self._dirty_mask(rng, n)
+        quantity[negative] = -quantity[negative]
+
+        df = pd.DataFrame({
+            'order_item_id': pd.Series(ids).map('ITEM{:010d}'.format),
+            'order_id': pd.Series(order_idx).map('ORD{:09d}'.format),
+            'product_id': product_id,
+            'quantity': quantity,
+            'price_per_unit': rng.integers(10, 20_000, n) * 1000
+        })
+        df.loc[self._dirty_mask(rng, n), 'product_id'] = None
+        return self._add_duplicates(rng, df)
+
+    def write_table(self, generate, total, file_path):
+        written = 0
+        for chunk_index, start, stop in self._chunks(total):
+            df = generate(chunk_index, start, stop)
+            df.to_csv(file_path, mode='w' if chunk_index == 0 else 'a', header=chunk_index == 0, index=False)
+            written += len(df)
+        logger.info("Wrote %s rows to %s", written, file_path)
+        return written
+
+    def generate_all(self, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        tables = [
+            ('customers.csv', self.generate_customers, self.n_customers),
+            ('products.csv', self.generate_products, self.n_products),
+            ('orders.csv', self.generate_orders, self.n_orders),
+            ('order_item.csv', self.generate_order_items, self.n_order_items)
+        ]
+
+        row_counts = {}
+        for file_name, generate, total in tables:
+            row_counts[file_name] = self.write_table(generate, total, os.path.join(output_dir, file_name))
+        return row_counts
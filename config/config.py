@@ -5,6 +5,13 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DATA_DIR = os.path.join(BASE_DIR, 'data', 'raw')
 PROCESSED_DATA_DIR = os.path.join(BASE_DIR, 'data', 'processed')
 WAREHOUSE_DATA_DIR = os.path.join(BASE_DIR, 'data', 'warehouse')
+CHECKPOINT_DIR = os.path.join(PROCESSED_DATA_DIR, 'checkpoints')
+TRANSFORM_CACHE_DIR = os.path.join(PROCESSED_DATA_DIR, 'transform_cache')
+DEDUP_SPILL_DIR = os.path.join(PROCESSED_DATA_DIR, 'dedup_spill')
+BENCHMARK_DATA_DIR = os.path.join(BASE_DIR, 'data', 'benchmark')
+INCOMING_DATA_DIR = os.path.join(BASE_DIR, 'data', 'incoming')
+SNAPSHOT_DIR = os.path.join(WAREHOUSE_DATA_DIR, 'snapshots')
+BENCHMARK_RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
 
 
 DATABASE_CONFIG = {
@@ -16,8 +23,76 @@ DATABASE_CONFIG = {
 
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
 LOG_FILE = os.path.join(LOG_DIR, 'etl_pipeline.log')
+RUN_REPORT_DIR = os.path.join(LOG_DIR, 'run_reports')
+PROFILE_DIR = os.path.join(LOG_DIR, 'profiles')
 
 DATA_QUALITY_CONFIG = {
     'max_null_percentage': 10,
     'min_rows_threshold': 1
-}
\ No newline at end of file
+}
+
+PIPELINE_CONFIG = {
+    'max_workers': 4,
+    'max_checkpoints': 5,
+    'record_runs': False,
+    'profile': os.environ.get('ETL_PROFILE', '').lower() in ('1', 'true', 'yes'),
+    'diagnostics': os.environ.get('ETL_DIAGNOSTICS', '').lower() in ('1', 'true', 'yes'),
+    'shard_workers': 1,
+    'dedup_mode': 'memory',
+    'dedup_chunk_rows': 1_000_000,
+    'quarantine_rejects': True
+}
+
+TRANSFORM_CACHE_CONFIG = {
+    'enabled': True,
+    'max_size_mb': 512,
+    'max_age_days': 7
+}
+
+SCD_CONFIG = {
+    'enabled': True,
+    'close_missing': False,
+    'dimensions': {
+        'customers': {'key': 'customer_id', 'columns': ['customer_name', 'email', 'city']},
+        'products': {'key': 'product_id', 'columns': ['product_name', 'category', 'price']}
+    }
+}
+
+INGESTION_CONFIG = {
+    'batch_size': 5000,
+    'flush_interval_seconds': 5.0,
+    'max_pending_records': 20000,
+    'poll_interval_seconds': 1.0,
+    'dimension_refresh_seconds': 60,
+    'host': '127.0.0.1',
+    'port': 8765
+}
+
+# Glob patterns relative to RAW_DATA_DIR, e.g. {'orders': 'orders/date=*/*.csv*'}.
+# Sources without a pattern are read from DataExtractor.SOURCE_FILES.
+EXTRACT_CONFIG = {
+    'source_patterns': {},
+    'max_workers': 4,
+    'stream_decompression': True
+}
+
+# Per-run versions of the loaded tables for DataLoader.execute_query(as_of=run_id).
+# Unchanged tables are shared between runs; runs beyond keep_runs or older
+# than max_age_days (None = no age limit) are evicted. Every changed table is
+# copied in full (CREATE TABLE AS SELECT plus its indexes), about as long as
+# loading it again, so at a few million rows the snapshot step is the tail
+# of the run. It runs after the other post-load writers; disable it when
+# as_of queries are not needed.
+SNAPSHOT_CONFIG = {
+    'enabled': True,
+    'keep_runs': 7,
+    'max_age_days': 30
+}
+
+ANALYTICS_SERVER_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8050,
+    'pool_size': 4,
+    'cache_entries': 256,
+    'cache_ttl_seconds': 300
+}
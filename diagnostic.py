@@ -1,6 +1,72 @@
 import sqlite3
 import pandas as pd 
 import os
+import sys
+import time
+import argparse
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from load import DataLoader
+from lineage import DROP_REASONS, FLAG_REASONS
+
+
+def fast_diagnostics(db_path, dropped_transform=None, max_rows=20):
+    # Reads only metadata: row counts and sizes the loader keeps in
+    # table_stats (or ANALYZE's sqlite_stat1) and the drop counters the
+    # transformer recorded during the last run. No table is scanned and
+    # nothing is re-extracted or re-transformed.
+    start = time.perf_counter()
+    loader = DataLoader(db_path)
+
+    print("\n[1] TABLES (from catalog statistics)")
+    stats = loader.get_table_stats()
+    print(stats.to_string(index=False))
+
+    print("\n[2] DROPPED ROWS (from transform lineage)")
+    lineage = loader.read_lineage()
+    if lineage.empty:
+        print("    No lineage recorded yet. Run: python run_pipeline.py")
+    else:
+        print(f"    Run: {lineage['run_id'].iloc[0]}")
+        counters = lineage.pivot(index='transform', columns='metric', values='rows')
+        for transform, row in counters.iterrows():
+            row = row.dropna().astype(int)
+            print(f"    {transform}: {row.get('rows_in', 0)} in -> {row.get('rows_out', 0)} out")
+            for reason, count in row.items():
+                if reason in DROP_REASONS and count:
+                    print(f"        - dropped, {reason}: {count} rows")
+                elif reason in FLAG_REASONS and count:
+                    print(f"        - kept, {reason}: {count} rows")
+
+    if dropped_transform:
+        # Positions are 0-based rows of the transform's input, in the order
+        # the extractor read them (file order, then line order).
+        print(f"\n[3] ROWS DROPPED OR FLAGGED BY {dropped_transform}")
+        row_lineage = loader.read_row_lineage(dropped_transform)
+        if row_lineage is None:
+            print("    No row lineage recorded for this transform")
+        else:
+            for reason in row_lineage.reasons:
+                positions = row_lineage.rows_with(reason)
+                if len(positions):
+                    shown = ', '.join(map(str, positions[:max_rows]))
+                    more = f" (+{len(positions) - max_rows} more)" if len(positions) > max_rows else ''
+                    print(f"    {reason}: input rows {shown}{more}")
+
+    print(f"\nFast diagnostic completed in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+parser = argparse.ArgumentParser(description="Diagnose the ETL warehouse")
+parser.add_argument(
+    '--fast',
+    action='store_true',
+    help="Report counts, sizes and dropped rows from metadata only, without scanning tables"
+)
+parser.add_argument(
+    '--dropped',
+    metavar='TRANSFORM',
+    help="With --fast, list the input rows a transform dropped or flagged (e.g. transform_orders)"
+)
+args = parser.parse_args()
 
 print("="*70)
 print("FULL DIAGNOSTIC - ETL PIPELINE")
@@ -19,6 +85,10 @@ else:
     print(" Run: python run_pipeline.py")
     exit(1)
 
+if args.fast:
+    fast_diagnostics(db_path, dropped_transform=args.dropped)
+    exit(0)
+
 
 print("\n[2] CONNECTING TO DATABASE...")
 try:
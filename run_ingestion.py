@@ -0,0 +1,85 @@
+import sys
+import os
+import signal
+import asyncio
+import logging
+import atexit
+import argparse
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.load import DataLoader
+from src.logging_setup import setup_logging
+from src.ingestion import DirectorySource, SocketSource, MicroBatchIngestor
+from config.config import DATABASE_CONFIG, INCOMING_DATA_DIR, LOG_DIR, INGESTION_CONFIG
+
+
+logger = logging.getLogger(__name__)
+
+def configure_logging():
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_file = os.path.join(LOG_DIR, f'ingestion_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl')
+    listener = setup_logging(log_file, level=logging.INFO)
+    atexit.register(listener.stop)
+    return log_file
+
+
+async def run_ingestion(source, batch_size, flush_interval, max_pending):
+    ingestor = MicroBatchIngestor(
+        DataLoader(DATABASE_CONFIG['warehouse']['path']),
+        batch_size=batch_size,
+        flush_interval=flush_interval,
+        max_pending=max_pending,
+        dimension_refresh_seconds=INGESTION_CONFIG['dimension_refresh_seconds']
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, ingestor.stop)
+
+    return await ingestor.run(source)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream order events into the warehouse in micro-batches")
+    parser.add_argument(
+        '--source',
+        choices=['directory', 'socket'],
+        default='directory',
+        help="Read JSON-lines files from a watched directory or records from a local socket"
+    )
+    parser.add_argument('--watch-dir', default=INCOMING_DATA_DIR)
+    parser.add_argument('--host', default=INGESTION_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=INGESTION_CONFIG['port'])
+    parser.add_argument('--socket-path', help="Listen on a unix socket instead of TCP")
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=INGESTION_CONFIG['batch_size'],
+        help="Flush once this many records are buffered"
+    )
+    parser.add_argument(
+        '--flush-interval',
+        type=float,
+        default=INGESTION_CONFIG['flush_interval_seconds'],
+        help="Flush buffered records at most this many seconds after the first one arrived"
+    )
+    parser.add_argument(
+        '--max-pending',
+        type=int,
+        default=INGESTION_CONFIG['max_pending_records'],
+        help="Stop reading from the source while this many records are queued"
+    )
+    args = parser.parse_args()
+
+    log_file = configure_logging()
+
+    if args.source == 'directory':
+        os.makedirs(args.watch_dir, exist_ok=True)
+        source = DirectorySource(args.watch_dir, poll_interval=INGESTION_CONFIG['poll_interval_seconds'])
+    else:
+        source = SocketSource(args.host, args.port, path=args.socket_path)
+
+    asyncio.run(run_ingestion(source, args.batch_size, args.flush_interval, args.max_pending))
+    logger.info("Log file: %s", log_file)
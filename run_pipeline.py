@@ -1,98 +1,343 @@
 import sys
 import os 
 import logging
+import atexit
+import argparse
+import operator
+import functools
 from datetime import datetime
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.extract import DataExtractor
 from src.transform import DataTransformer
-from src.load import DataLoader
+from src.load import DataLoader, INDEX_DEFINITIONS
 from src.data_quality import DataQualityChecker
+from src.orchestrator import PipelineDAG
+from src.checkpoint import CheckpointManager
+from src.cache import TransformCache
+from src.metrics import PipelineMetrics
+from src.profiling import StageProfiler
+from src.logging_setup import setup_logging
+from src.sharding import ShardedTransformer
+from src.external_dedup import ExternalDeduplicator
+from src.scd import SCD2Loader
+from src.snapshots import SnapshotStore
+from config.config import (
+    CHECKPOINT_DIR,
+    TRANSFORM_CACHE_DIR,
+    DEDUP_SPILL_DIR,
+    SNAPSHOT_DIR,
+    RUN_REPORT_DIR,
+    PROFILE_DIR,
+    PIPELINE_CONFIG,
+    TRANSFORM_CACHE_CONFIG,
+    SCD_CONFIG,
+    SNAPSHOT_CONFIG,
+    EXTRACT_CONFIG
+)
 
 log_dir = os.path.join(os.path.dirname(__file__), 'logs')
 os.makedirs(log_dir, exist_ok=True)
 
-log_file = os.path.join(log_dir, f'etl_pipeline_{datetime.now().strftime("%Y%m%d_%H%M%S%")}.log')
+log_file = None
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers= [
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
+def configure_logging():
+    # Records go through a queue; a listener thread formats them and writes the
+    # JSON-lines file and the console, keeping log I/O off the worker threads.
+    # Called from __main__ only, so shard worker processes that re-import this
+    # module do not open log files of their own.
+    global log_file
+    log_file = os.path.join(log_dir, f'etl_pipeline_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl')
+    listener = setup_logging(log_file, level=logging.INFO)
+    atexit.register(listener.stop)
+    return listener
 
 logger = logging.getLogger(__name__)
 
-def run_etl_pipeline():
-    try:
-        logging.info("="*70)
-        logging.info("ETL PIPELINE STARTED")
-        logging.info("="*70)
-        start_time = datetime.now()
-        
-        logging.info("\n [STEP 1/5] EXTRACTING DATA...")
-        logging.info("="*70)
+LINEAGE_TRANSFORMS = ['transform_orders', 'transform_customers', 'transform_order_items', 'transform_products']
 
-        raw_data_dir = os.path.join(os.path.dirname(__file__), 'data', 'raw')
-        extractor = DataExtractor(raw_data_dir)
-        raw_data = extractor.extract_all()
+def run_quality_checks(checker, orders, customers, order_items, products, fact_sales):
+    checker.check_null_values(
+        orders,
+        'orders',
+        ['order_id', 'customer_id'],
+        max_null_pct=5
+    )
+    checker.check_duplicates(orders, 'orders', ['order_id'])
+    checker.check_row_count(orders, 'orders', min_rows=1)
+
+    checker.check_null_values(
+        customers,
+        'customers',
+        ['customer_id'],
+        max_null_pct=5
+    )
+    checker.check_duplicates(customers, 'customers', ['customer_id'])
 
-        logging.info(f"Extraction completed. Tables extracted: {list(raw_data.keys())}")
+    checker.check_value_ranges(
+        fact_sales,
+        'fact_sales',
+        {
+            'quantity': {'min': 0},
+            'price_per_unit': {'min': 0} 
+        }
+    )
+    checker.check_row_count(fact_sales, 'fact_sales', min_rows=1)
 
-        logging.info("\n [STEP 2/5] TRANSFORMING DATA...")
-        logging.info("-"*70)
+    checker.check_referential_integrity(
+        orders, 'orders', 'customer_id',
+        customers, 'customers'
+    )
+    checker.check_referential_integrity(
+        order_items, 'order_items', 'order_id',
+        orders, 'orders'
+    )
+    checker.check_referential_integrity(
+        order_items, 'order_items', 'product_id',
+        products, 'products'
+    )
 
-        transformer = DataTransformer()
-        transformed_data = transformer.transform_all(raw_data)
+    quality_report = checker.generate_report()
+    logger.info("Quality checks completed: %s/%s passed", quality_report['passed'], quality_report['total_checks'])
 
-        logging.info(f"Transformation completed. Tables transformed: {list(transformed_data.keys())}")
+    if quality_report['failed'] > 0:
+        logger.warning(" %s quality checks failed!", quality_report['failed'])
+        checker.print_report()
 
-        logging.info("\n [STEP 3/5] RUNNING DATA QUALITY CHECKS")
-        logging.info("-"*70)
+    return quality_report
 
-        checker = DataQualityChecker()
 
-        checker.check_null_values(
-            transformed_data['orders'],
-            'orders',
-            ['order_id', 'customer_id'],
-            max_null_pct=5
+def build_pipeline_dag(raw_data_dir, warehouse_db, metrics, max_workers=4, resume=False, use_cache=True,
+                       profiler=None, diagnostics=False, shard_workers=1, dedup_mode='memory',
+                       start_date=None, end_date=None):
+    extractor = metrics.instrument(
+        DataExtractor(
+            raw_data_dir,
+            source_patterns=EXTRACT_CONFIG['source_patterns'],
+            start_date=start_date,
+            end_date=end_date,
+            max_workers=EXTRACT_CONFIG['max_workers'],
+            stream_decompression=EXTRACT_CONFIG['stream_decompression']
+        ),
+        'extract'
+    )
+
+    cache = None
+    if use_cache and TRANSFORM_CACHE_CONFIG['enabled']:
+        cache = TransformCache(
+            TRANSFORM_CACHE_DIR,
+            max_size_mb=TRANSFORM_CACHE_CONFIG['max_size_mb'],
+            max_age_days=TRANSFORM_CACHE_CONFIG['max_age_days']
         )
-        checker.check_duplicates(transformed_data['orders'], 'orders', ['order_id'])
-        checker.check_row_count(transformed_data['orders'], 'orders', min_rows=1)
-
-        checker.check_null_values(
-            transformed_data['customers'],
-            'customers',
-            ['customer_id'],
-            max_null_pct=5
+    deduplicator = None
+    if dedup_mode == 'external':
+        deduplicator = ExternalDeduplicator(DEDUP_SPILL_DIR, chunk_rows=PIPELINE_CONFIG['dedup_chunk_rows'])
+    transformer = metrics.instrument(
+        DataTransformer(cache=cache, diagnostics=diagnostics, deduplicator=deduplicator),
+        'transform'
+    )
+    checker = metrics.instrument(DataQualityChecker(), 'quality')
+    snapshots = None
+    if SNAPSHOT_CONFIG['enabled']:
+        snapshots = SnapshotStore(
+            warehouse_db,
+            SNAPSHOT_DIR,
+            keep_runs=SNAPSHOT_CONFIG['keep_runs'],
+            max_age_days=SNAPSHOT_CONFIG['max_age_days'],
+            index_definitions=INDEX_DEFINITIONS
         )
-        checker.check_duplicates(transformed_data['customers'], 'customers', ['customer_id'])
-        
-        checker.check_value_ranges(
-            transformed_data['fact_sales'],
-            'fact_sales',
-            {
-                'quantity': {'min': 0},
-                'price_per_unit': {'min': 0} 
-            }
+    loader = metrics.instrument(DataLoader(warehouse_db, snapshots=snapshots), 'load')
+
+    source_files = [path for paths in extractor.get_source_paths().values() for path in paths]
+    fingerprint = CheckpointManager.fingerprint_files(source_files)
+    checkpoint = CheckpointManager(
+        CHECKPOINT_DIR,
+        fingerprint,
+        max_checkpoints=PIPELINE_CONFIG['max_checkpoints']
+    )
+    logger.info("Input fingerprint: %s (resume=%s)", fingerprint, resume)
+
+    def load_tables(orders, customers, order_items, products, fact_sales):
+        loader.load_all({
+            'orders': orders,
+            'customers': customers,
+            'order_items': order_items,
+            'products': products,
+            'fact_sales': fact_sales
+        })
+        logger.info(" Data Loaded to warehouse: %s", warehouse_db)
+
+    transformed_tasks = [
+        'transform_orders', 'transform_customers', 'transform_order_items',
+        'transform_products', 'create_fact_sales'
+    ]
+
+    dag = PipelineDAG(max_workers=max_workers, checkpoint=checkpoint, resume=resume, profiler=profiler)
+
+    def lineage_state(*transforms):
+        # Row lineage is checkpointed with the frames it describes, so a
+        # resumed run that restores a transform still knows its drops.
+        def dump():
+            return {name: transformer.lineage[name] for name in transforms if name in transformer.lineage}
+        return dump, transformer.lineage.update
+
+    dag.add_task('extract_orders', extractor.extract_orders)
+    dag.add_task('extract_customers', extractor.extract_customers)
+    dag.add_task('extract_order_items', extractor.extract_order_item)
+    dag.add_task('extract_products', extractor.extract_products)
+
+    dag.add_task(
+        'transform_customers',
+        transformer.transform_customers,
+        inputs=['extract_customers'],
+        state=lineage_state('transform_customers')
+    )
+    dag.add_task(
+        'transform_products',
+        transformer.transform_products,
+        inputs=['extract_products'],
+        state=lineage_state('transform_products')
+    )
+
+    if shard_workers > 1:
+        sharded = metrics.instrument(
+            ShardedTransformer(n_workers=shard_workers, diagnostics=diagnostics, transformer=transformer),
+            'transform_sharded'
+        )
+        dag.add_task(
+            'transform_sharded',
+            sharded.transform_orders_and_facts,
+            inputs=['extract_orders', 'extract_order_items', 'transform_customers', 'transform_products'],
+            state=lineage_state('transform_orders', 'transform_order_items')
+        )
+        dag.add_task('transform_orders', operator.itemgetter('orders'), inputs=['transform_sharded'])
+        dag.add_task('transform_order_items', operator.itemgetter('order_items'), inputs=['transform_sharded'])
+        dag.add_task('create_fact_sales', operator.itemgetter('fact_sales'), inputs=['transform_sharded'])
+    else:
+        dag.add_task(
+            'transform_orders',
+            transformer.transform_orders,
+            inputs=['extract_orders'],
+            state=lineage_state('transform_orders')
+        )
+        dag.add_task(
+            'transform_order_items',
+            transformer.transform_order_items,
+            inputs=['extract_order_items'],
+            state=lineage_state('transform_order_items')
+        )
+        dag.add_task(
+            'create_fact_sales',
+            transformer.create_fact_sales,
+            inputs=['transform_orders', 'transform_order_items', 'transform_customers', 'transform_products']
         )
-        checker.check_row_count(transformed_data['fact_sales'], 'fact_sales', min_rows=1)
 
-        quality_report = checker.generate_report()
-        logger.info(f"Quality checks completed: {quality_report['passed']}/{quality_report['total_checks']} passed")
+    dag.add_task('quality_checks', functools.partial(run_quality_checks, checker), inputs=transformed_tasks)
+    dag.add_task('load', load_tables, inputs=transformed_tasks, depends_on=['quality_checks'], side_effect=True)
 
-        if quality_report['failed'] > 0:
-            logger.warning(f" {quality_report['failed']} quality checks failed!")
-            checker.print_report()
+    # Every post-load task writes to the warehouse file and SQLite takes one
+    # writer at a time, so they run one after another instead of racing for
+    # the lock (and the busy timeout) in parallel.
+    writers = ['load']
 
-        
-        logging.info("\n [STEP 4/5] LOADING DATA TO WAREHOUSE...")
-        logging.info("-"*70)
+    def add_writer(name, func, inputs=None):
+        dag.add_task(name, func, inputs=inputs, depends_on=[writers[-1]], side_effect=True)
+        writers.append(name)
+
+    add_writer('create_indexes', loader.create_indexes)
+
+    def record_lineage():
+        # Counters for the transforms that ran (or came from the cache or a
+        # checkpoint) in this run, so diagnostics can explain dropped rows later.
+        missing = [name for name in LINEAGE_TRANSFORMS if name not in transformer.lineage]
+        if missing:
+            raise RuntimeError(f"No row lineage for {missing}; re-run without --resume")
+        return loader.record_lineage(metrics.run_id, transformer.lineage)
+
+    add_writer('record_lineage', record_lineage)
 
+    if PIPELINE_CONFIG['quarantine_rejects']:
+        def load_rejected(orders, customers, order_items, products):
+            rejected = transformer.collect_rejected({
+                'orders': orders,
+                'customers': customers,
+                'order_items': order_items,
+                'products': products
+            })
+            return loader.load_rejected(rejected, metrics.run_id)
+
+        add_writer(
+            'load_rejected',
+            load_rejected,
+            inputs=['extract_orders', 'extract_customers', 'extract_order_items', 'extract_products']
+        )
+
+    if SCD_CONFIG['enabled']:
+        history = metrics.instrument(
+            SCD2Loader(loader, SCD_CONFIG['dimensions'], close_missing=SCD_CONFIG['close_missing']),
+            'history'
+        )
+
+        def load_history(customers, products):
+            return history.apply_all({'customers': customers, 'products': products})
+
+        add_writer('load_history', load_history, inputs=['transform_customers', 'transform_products'])
+
+    if snapshots is not None:
+        snapshot_store = metrics.instrument(snapshots, 'snapshot')
+
+        def snapshot_tables(orders, customers, order_items, products, fact_sales):
+            return snapshot_store.create(metrics.run_id, {
+                'orders': orders,
+                'customers': customers,
+                'order_items': order_items,
+                'products': products,
+                'fact_sales': fact_sales
+            })
+
+        # The full table copies are the slowest writer, so they go last.
+        add_writer('snapshot', snapshot_tables, inputs=transformed_tasks)
+
+    return dag, loader, checkpoint
+
+
+def finish_run_report(metrics, status, dag=None, loader=None, record_run=False):
+    stages, critical_path = {}, []
+    if dag is not None:
+        stages = dag.get_task_timings()
+        critical_path, _ = dag.critical_path()
+
+    report = metrics.build_report(status, stages=stages, critical_path=critical_path)
+    metrics.log_summary()
+    metrics.write_json(report, RUN_REPORT_DIR)
+
+    if record_run and loader is not None:
+        metrics.write_to_warehouse(report, loader)
+    return report
+
+
+def run_etl_pipeline(max_workers=PIPELINE_CONFIG['max_workers'], resume=False, use_cache=True,
+                     record_run=PIPELINE_CONFIG['record_runs'], profile=PIPELINE_CONFIG['profile'],
+                     diagnostics=PIPELINE_CONFIG['diagnostics'], shard_workers=PIPELINE_CONFIG['shard_workers'],
+                     dedup_mode=PIPELINE_CONFIG['dedup_mode'], start_date=None, end_date=None):
+    metrics = PipelineMetrics()
+    profiler = StageProfiler(os.path.join(PROFILE_DIR, metrics.run_id), enabled=profile)
+    dag, loader = None, None
+
+    if profile and max_workers > 1:
+        # tracemalloc is process-wide, so stages only get clean allocation
+        # numbers when they do not overlap.
+        logger.info("Profiling enabled: running tasks one at a time")
+        max_workers = 1
+
+    try:
+        logging.info("="*70)
+        logging.info("ETL PIPELINE STARTED")
+        logging.info("="*70)
+        start_time = datetime.now()
+
+        raw_data_dir = os.path.join(os.path.dirname(__file__), 'data', 'raw')
         warehouse_db = os.path.join(
             os.path.dirname(__file__),
             'data',
@@ -100,16 +345,27 @@ def run_etl_pipeline():
             'ecommerce_warehouse.db'
         )
 
-        loader = DataLoader(warehouse_db)
-        loader.load_all(transformed_data)
-
-        logger.info(f" Data Loaded to warehouse: {warehouse_db}")
-
-        logging.info("\n [STEP 5/5] CREATING INDEXES...")
-        logging.info("-"*70)
-
-        loader.create_indexes()
-        logger.info("Indexes created successfully")
+        dag, loader, checkpoint = build_pipeline_dag(
+            raw_data_dir,
+            warehouse_db,
+            metrics,
+            max_workers=max_workers,
+            resume=resume,
+            use_cache=use_cache,
+            profiler=profiler,
+            diagnostics=diagnostics,
+            shard_workers=shard_workers,
+            dedup_mode=dedup_mode,
+            start_date=start_date,
+            end_date=end_date
+        )
+        profiler.start()
+        try:
+            dag.run()
+        finally:
+            profiler.stop()
+            dag.log_summary()
+        checkpoint.prune()
 
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -117,28 +373,104 @@ def run_etl_pipeline():
         logger.info("\n" + "="*70)
         logger.info("ETL PIPELINE COMPLETED SUCCESSFULLY")
         logger.info("="*70)
-        logger.info(f"Start time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"End time: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"Duration: {duration:.2f} seconds")
+        logger.info("Start time: %s", start_time.strftime('%Y-%m-%d %H:%M:%S'))
+        logger.info("End time: %s", end_time.strftime('%Y-%m-%d %H:%M:%S'))
+        logger.info("Duration: %.2f seconds", duration)
 
 
         table_info = loader.get_table_info()
-        logger.info(f"\nWarehouse Tables:")
+        logger.info("\nWarehouse Tables:")
         for table, count in table_info.items():
-            logger.info(f"  - {table}: {count} rows")
+            logger.info("  - %s: %s rows", table, count)
         
+        finish_run_report(metrics, 'success', dag, loader, record_run)
+
         logger.info("\n ETL pipeline execution successful!")
-        logger.info(f"Log file: {log_file}")
+        logger.info("Log file: %s", log_file)
 
         return True
     
     
     except Exception as e:
-        logger.error(f"ETL Pipeline failed: {str(e)}", exc_info=True)
+        logger.error("ETL Pipeline failed: %s", e, exc_info=True)
+        try:
+            finish_run_report(metrics, 'failed', dag, loader, record_run)
+        except Exception as report_error:
+            logger.error("Could not write run report: %s", report_error)
         return False
     
 if __name__ == "__main__":
-    success = run_etl_pipeline()
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description="Run the e-commerce ETL pipeline")
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Skip stages that already have a checkpoint for the current input files"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=PIPELINE_CONFIG['max_workers'],
+        help="Number of tasks that may run concurrently"
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Recompute every transform instead of reading unchanged tables from the transform cache"
+    )
+    parser.add_argument(
+        '--record-run',
+        action='store_true',
+        default=PIPELINE_CONFIG['record_runs'],
+        help="Append the run report to the pipeline_runs table in the warehouse"
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        default=PIPELINE_CONFIG['profile'],
+        help="Profile every stage with cProfile and tracemalloc (also enabled by ETL_PROFILE=1)"
+    )
+    parser.add_argument(
+        '--diagnostics',
+        action='store_true',
+        default=PIPELINE_CONFIG['diagnostics'],
+        help="Log extra NULL counts and samples from the transform step (also enabled by ETL_DIAGNOSTICS=1)"
+    )
+    parser.add_argument(
+        '--shard-workers',
+        type=int,
+        default=PIPELINE_CONFIG['shard_workers'],
+        help="Hash-partition orders/order items by order_id and transform the shards on this many processes"
+    )
+    parser.add_argument(
+        '--dedup-mode',
+        choices=['memory', 'external'],
+        default=PIPELINE_CONFIG['dedup_mode'],
+        help="'external' removes duplicates with an on-disk sort/merge so memory stays bounded"
+    )
+    parser.add_argument(
+        '--start-date',
+        help="Only read partitioned source files dated on or after this day (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        '--end-date',
+        help="Only read partitioned source files dated on or before this day (YYYY-MM-DD)"
+    )
+    args = parser.parse_args()
+
+    success = run_etl_pipeline(
+        max_workers=args.workers,
+        resume=args.resume,
+        use_cache=not args.no_cache,
+        record_run=args.record_run,
+        profile=args.profile,
+        diagnostics=args.diagnostics,
+        shard_workers=args.shard_workers,
+        dedup_mode=args.dedup_mode,
+        start_date=args.start_date,
+        end_date=args.end_date
+    )
 
     if success:
         print("\n" + "🎉"*20)
@@ -0,0 +1,47 @@
+import sys
+import os
+import logging
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.load import DataLoader
+from src.analytics_server import AnalyticsService, make_server
+from config.config import DATABASE_CONFIG, ANALYTICS_SERVER_CONFIG
+
+
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the analytics queries over HTTP/JSON")
+    parser.add_argument('--host', default=ANALYTICS_SERVER_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=ANALYTICS_SERVER_CONFIG['port'])
+    parser.add_argument(
+        '--pool-size',
+        type=int,
+        default=ANALYTICS_SERVER_CONFIG['pool_size'],
+        help="Number of read-only warehouse connections shared by request threads"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    warehouse_db = DATABASE_CONFIG['warehouse']['path']
+    if not os.path.exists(warehouse_db):
+        print("Data warehouse tidak ditemukan, jalankan dulu: python run_pipeline.py")
+        sys.exit(1)
+
+    service = AnalyticsService(
+        DataLoader(warehouse_db),
+        pool_size=args.pool_size,
+        cache_entries=ANALYTICS_SERVER_CONFIG['cache_entries'],
+        cache_ttl_seconds=ANALYTICS_SERVER_CONFIG['cache_ttl_seconds']
+    )
+    server = make_server(service, args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down analytics server")
+    finally:
+        server.server_close()
+        service.close()
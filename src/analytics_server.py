@@ -0,0 +1,202 @@
+import json
+import time
+import queue
+import logging
+import threading
+import contextlib
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+logger = logging.getLogger(__name__)
+
+class ConnectionPool:
+    def __init__(self, loader, size=4):
+        self.size = size
+        self._connections = queue.Queue()
+        for _ in range(size):
+            self._connections.put(loader.connect_read_only())
+
+    @contextlib.contextmanager
+    def connection(self):
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    def close(self):
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+class ResultCache:
+    def __init__(self, max_entries=256, ttl_seconds=300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class QueryStats:
+    def __init__(self, window=1000):
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, cached):
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                'requests': 0,
+                'cache_hits': 0,
+                'errors': 0,
+                'latencies': deque(maxlen=self.window)
+            })
+            stats['requests'] += 1
+            if cached:
+                stats['cache_hits'] += 1
+            if seconds is None:
+                stats['errors'] += 1
+            else:
+                stats['latencies'].append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            report = {}
+            for name, stats in self._stats.items():
+                latencies = sorted(stats['latencies'])
+                entry = {key: stats[key] for key in ('requests', 'cache_hits', 'errors')}
+                if latencies:
+                    entry['p50_ms'] = round(latencies[len(latencies) // 2] * 1000, 3)
+                    entry['p95_ms'] = round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000, 3)
+                    entry['max_ms'] = round(latencies[-1] * 1000, 3)
+                report[name] = entry
+            return report
+
+
+class AnalyticsService:
+    def __init__(self, loader, pool_size=4, cache_entries=256, cache_ttl_seconds=300):
+        self.loader = loader
+        logger.info("Warehouse journal mode: %s", loader.enable_wal())
+        self.pool = ConnectionPool(loader, size=pool_size)
+        self.cache = ResultCache(max_entries=cache_entries, ttl_seconds=cache_ttl_seconds)
+        self.stats = QueryStats()
+        self._version_conn = loader.connect_read_only()
+        self._version_lock = threading.Lock()
+        logger.info("AnalyticsService initialized with %s read-only connections", pool_size)
+
+    def generation(self):
+        # data_version changes whenever another connection commits, so a
+        # pipeline run or an ingestion flush retires every cached result.
+        with self._version_lock:
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def coerce_params(self, name, raw_params):
+        defaults = self.loader.queries[name]['params']
+        params = {}
+        for key, value in raw_params.items():
+            default = defaults.get(key)
+            params[key] = int(value) if isinstance(default, int) else value
+        return params
+
+    def describe(self):
+        return {name: spec['params'] for name, spec in self.loader.queries.items()}
+
+    def run(self, name, raw_params):
+        if name not in self.loader.queries:
+            raise KeyError(f"Unknown query '{name}'")
+        start = time.perf_counter()
+        try:
+            params = self.coerce_params(name, raw_params)
+            sql, bound = self.loader.bind_params(name, params)
+            key = (self.generation(), name, tuple(sorted(bound.items())))
+
+            result = self.cache.get(key)
+            cached = result is not None
+            if not cached:
+                with self.pool.connection() as conn:
+                    cursor = conn.execute(sql, bound)
+                    columns = [col[0] for col in cursor.description]
+                    result = {'query': name, 'params': bound, 'columns': columns, 'rows': cursor.fetchall()}
+                self.cache.put(key, result)
+        except Exception:
+            self.stats.record(name, None, False)
+            raise
+
+        elapsed = time.perf_counter() - start
+        self.stats.record(name, elapsed, cached)
+        return {**result, 'cached': cached, 'elapsed_ms': round(elapsed * 1000, 3)}
+
+    def close(self):
+        self.pool.close()
+        self._version_conn.close()
+
+
+class AnalyticsRequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        try:
+            if parts == ['queries']:
+                self._send_json(200, self.service.describe())
+            elif parts == ['metrics']:
+                self._send_json(200, {
+                    'queries': self.service.stats.snapshot(),
+                    'cache_entries': len(self.service.cache)
+                })
+            elif len(parts) == 2 and parts[0] == 'query':
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                self._send_json(200, self.service.run(parts[1], params))
+            else:
+                self._send_json(404, {'error': f"Unknown path: {url.path}"})
+        except KeyError as e:
+            self._send_json(404, {'error': e.args[0]})
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            logger.error("Error handling %s: %s", self.path, e, exc_info=True)
+            self._send_json(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(service, host='127.0.0.1', port=8050):
+    handler = type('BoundAnalyticsRequestHandler', (AnalyticsRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    logger.info("Analytics server listening on http://%s:%s", host, port)
+    return server
@@ -0,0 +1,156 @@
+import pandas as pd
+import os
+import sys
+import time
+import hashlib
+import inspect
+import logging
+import functools
+import contextlib
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+class TransformCache:
+    def __init__(self, cache_dir, max_size_mb=512, max_age_days=7):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._code_versions = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        logger.info("TransformCache initialized with cache_dir: %s", cache_dir)
+
+    @staticmethod
+    def source_modules(owner):
+        # The owner's module, the modules of the helpers it holds (date
+        # parser, deduplicator) and, transitively, everything they use from
+        # the same package; a change to any of them can change the output.
+        package = type(owner).__module__.split('.')[0]
+        pending = [type(owner).__module__] + [type(value).__module__ for value in vars(owner).values()]
+        seen = set()
+        while pending:
+            name = pending.pop()
+            if name in seen or name.split('.')[0] != package or name not in sys.modules:
+                continue
+            seen.add(name)
+            for value in vars(sys.modules[name]).values():
+                dep = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+                if isinstance(dep, str):
+                    pending.append(dep)
+        return tuple(sorted(seen))
+
+    def code_version(self, owner):
+        modules = self.source_modules(owner)
+        key = (type(owner), modules)
+        if key not in self._code_versions:
+            digest = hashlib.sha256()
+            for name in modules:
+                source_file = inspect.getsourcefile(sys.modules[name])
+                if source_file and os.path.exists(source_file):
+                    digest.update(name.encode())
+                    with open(source_file, 'rb') as f:
+                        digest.update(f.read())
+            digest.update(str(getattr(owner, 'CACHE_VERSION', '')).encode())
+            self._code_versions[key] = digest.hexdigest()
+        return self._code_versions[key]
+
+    def make_key(self, owner, method_name, frames):
+        digest = hashlib.sha256()
+        digest.update(method_name.encode())
+        digest.update(self.code_version(owner).encode())
+        for df in frames:
+            digest.update(str(list(df.columns)).encode())
+            digest.update(str(list(df.dtypes)).encode())
+            digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            result = pd.read_pickle(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            # A truncated or unreadable entry is dropped and recomputed.
+            logger.warning("Discarding unreadable transform cache entry %s: %s", key[:12], e)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            self.misses += 1
+            return None
+        # Touch on read so eviction drops the least recently used entries first.
+        os.utime(path)
+        self.hits += 1
+        return result
+
+    def put(self, key, value):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            pd.to_pickle(value, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("Could not write transform cache entry %s: %s", key[:12], e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        with self._lock:
+            now = time.time()
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    os.remove(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                os.remove(path)
+                total -= size
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def cached_transform(method):
+    @functools.wraps(method)
+    def wrapper(self, *frames):
+        cache = getattr(self, 'cache', None)
+        if cache is None:
+            return method(self, *frames)
+
+        key = cache.make_key(self, method.__name__, frames)
+        entry = cache.get(key)
+        if entry is not None:
+            # The lineage counters are cached with the frame, so a cache hit
+            # still reports why rows were dropped.
+            result, lineage = entry
+            if lineage is not None:
+                self.lineage[method.__name__] = lineage
+            logger.info("%s: served from cache (%s rows)", method.__name__, len(result))
+            return result
+
+        result = method(self, *frames)
+        cache.put(key, (result, getattr(self, 'lineage', {}).get(method.__name__)))
+        return result
+    return wrapper
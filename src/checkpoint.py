@@ -0,0 +1,176 @@
+import pandas as pd
+import os
+import json
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+
+
+logger = logging.getLogger(__name__)
+
+class CheckpointManager:
+    def __init__(self, checkpoint_dir, fingerprint, max_checkpoints=5):
+        self.checkpoint_dir = checkpoint_dir
+        self.fingerprint = fingerprint
+        self.max_checkpoints = max_checkpoints
+        self.run_dir = os.path.join(checkpoint_dir, fingerprint)
+        self.interrupted = False
+
+        os.makedirs(self.run_dir, exist_ok=True)
+        logger.info("CheckpointManager initialized with run_dir: %s", self.run_dir)
+
+    @staticmethod
+    def fingerprint_files(file_paths):
+        # Keyed on name, size and mtime so a run never has to read the inputs
+        # just to find its checkpoint directory.
+        digest = hashlib.sha256()
+        for path in sorted(file_paths):
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()[:16]
+
+    def _state_path(self):
+        return os.path.join(self.run_dir, '_run.json')
+
+    def _write_state(self, status):
+        tmp_path = self._state_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'status': status, 'updated_at': datetime.now().isoformat()}, f)
+        os.replace(tmp_path, self._state_path())
+
+    def begin(self, resume=False):
+        # Only the checkpoints of a run that never finished may stand in for
+        # its side effects; a fresh run starts from an empty directory.
+        previous = None
+        if resume and os.path.exists(self._state_path()):
+            with open(self._state_path()) as f:
+                previous = json.load(f).get('status')
+        self.interrupted = previous == 'running'
+
+        if not resume:
+            shutil.rmtree(self.run_dir, ignore_errors=True)
+            os.makedirs(self.run_dir, exist_ok=True)
+        self._write_state('running')
+        logger.info("Checkpoint run started (resume=%s, interrupted=%s)", resume, self.interrupted)
+
+    def complete(self):
+        self._write_state('complete')
+
+    def _manifest_path(self, task_name):
+        return os.path.join(self.run_dir, f"{task_name}.json")
+
+    def has(self, task_name):
+        return os.path.exists(self._manifest_path(task_name))
+
+    def _read_manifest(self, task_name):
+        with open(self._manifest_path(task_name)) as f:
+            return json.load(f)
+
+    def has_state(self, task_name):
+        return self.has(task_name) and self._read_manifest(task_name).get('state') is not None
+
+    def save(self, task_name, result, state=None):
+        manifest = {
+            'task': task_name,
+            'fingerprint': self.fingerprint,
+            'created_at': datetime.now().isoformat(),
+            'format': None,
+            'file': None
+        }
+
+        try:
+            if isinstance(result, pd.DataFrame):
+                manifest['format'], manifest['file'] = self._save_frame(task_name, result)
+                manifest['rows'] = len(result)
+            elif isinstance(result, dict) and result and all(isinstance(v, pd.DataFrame) for v in result.values()):
+                manifest['format'] = 'frames'
+                manifest['file'] = {
+                    name: self._save_frame(f"{task_name}.{name}", df)
+                    for name, df in result.items()
+                }
+                manifest['rows'] = {name: len(df) for name, df in result.items()}
+            elif result is not None:
+                manifest['format'] = 'json'
+                manifest['value'] = result
+
+            if state is not None:
+                state_path = os.path.join(self.run_dir, f"{task_name}.state.pkl")
+                pd.to_pickle(state, state_path)
+                manifest['state'] = os.path.basename(state_path)
+
+            # The manifest is written last so a crash mid-write never looks complete.
+            tmp_path = self._manifest_path(task_name) + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f, default=str)
+            os.replace(tmp_path, self._manifest_path(task_name))
+            logger.info("Checkpoint saved for '%s'", task_name)
+        except Exception as e:
+            logger.error("Error saving checkpoint for '%s': %s", task_name, e)
+            raise
+
+    def _save_frame(self, name, df):
+        file_path = os.path.join(self.run_dir, f"{name}.parquet")
+        try:
+            df.to_parquet(file_path, index=False)
+            return 'parquet', os.path.basename(file_path)
+        except (ImportError, ValueError, TypeError) as e:
+            # Mixed-type object columns cannot always be written as parquet.
+            logger.warning("Parquet checkpoint failed for '%s', falling back to pickle: %s", name, e)
+            file_path = os.path.join(self.run_dir, f"{name}.pkl")
+            df.to_pickle(file_path)
+            return 'pickle', os.path.basename(file_path)
+
+    def _load_frame(self, file_format, file_name):
+        path = os.path.join(self.run_dir, file_name)
+        if file_format == 'parquet':
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
+    def load(self, task_name):
+        try:
+            manifest = self._read_manifest(task_name)
+
+            if manifest['format'] in ('parquet', 'pickle'):
+                result = self._load_frame(manifest['format'], manifest['file'])
+            elif manifest['format'] == 'frames':
+                result = {
+                    name: self._load_frame(file_format, file_name)
+                    for name, (file_format, file_name) in manifest['file'].items()
+                }
+            elif manifest['format'] == 'json':
+                result = manifest['value']
+            else:
+                result = None
+
+            logger.info("Checkpoint loaded for '%s'", task_name)
+            return result
+        except Exception as e:
+            logger.error("Error loading checkpoint for '%s': %s", task_name, e)
+            raise
+
+    def load_state(self, task_name):
+        manifest = self._read_manifest(task_name)
+        return pd.read_pickle(os.path.join(self.run_dir, manifest['state']))
+
+    def prune(self):
+        if not os.path.isdir(self.checkpoint_dir):
+            return []
+
+        runs = [
+            os.path.join(self.checkpoint_dir, name)
+            for name in os.listdir(self.checkpoint_dir)
+            if os.path.isdir(os.path.join(self.checkpoint_dir, name))
+        ]
+        runs.sort(key=os.path.getmtime, reverse=True)
+
+        removed = []
+        for path in runs[self.max_checkpoints:]:
+            if path == self.run_dir:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(os.path.basename(path))
+
+        if removed:
+            logger.info("Pruned %s old checkpoints: %s", len(removed), removed)
+        return removed
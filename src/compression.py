@@ -0,0 +1,121 @@
+import io
+import os
+import bz2
+import gzip
+import queue
+import shutil
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.zst': 'zstd'
+}
+
+
+def detect_compression(path):
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def open_compressed(path, compression):
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'bz2':
+        return bz2.open(path, 'rb')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Reading .zst files requires the 'zstandard' package") from e
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def compress_file(source_path, target_path, compression, block_size=1024 * 1024):
+    if compression == 'gzip':
+        target = gzip.open(target_path, 'wb')
+    elif compression == 'bz2':
+        target = bz2.open(target_path, 'wb')
+    elif compression == 'zstd':
+        import zstandard
+        target = zstandard.ZstdCompressor().stream_writer(open(target_path, 'wb'), closefd=True)
+    else:
+        raise ValueError(f"Unsupported compression: {compression}")
+
+    with open(source_path, 'rb') as source, target:
+        shutil.copyfileobj(source, target, block_size)
+    return target_path
+
+
+class ThreadedDecompressor(io.RawIOBase):
+    # zlib, bz2 and zstandard release the GIL while decompressing, so a
+    # background thread can inflate the next blocks while the CSV parser
+    # tokenizes the current ones. The bounded queue caps read-ahead memory.
+    _EOF = object()
+
+    def __init__(self, path, compression=None, block_size=1024 * 1024, max_blocks=8):
+        self.path = path
+        self.compression = compression or detect_compression(path)
+        self.block_size = block_size
+        self._blocks = queue.Queue(maxsize=max_blocks)
+        self._pending = memoryview(b'')
+        self._closed_event = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name=f"decompress-{os.path.basename(path)}", daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._closed_event.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            with open_compressed(self.path, self.compression) as source:
+                while True:
+                    block = source.read(self.block_size)
+                    if not block:
+                        break
+                    if not self._put(block):
+                        return
+            self._put(self._EOF)
+        except BaseException as e:
+            self._put(e)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            item = self._blocks.get()
+            if item is self._EOF:
+                self._blocks.put(self._EOF)
+                return 0
+            if isinstance(item, BaseException):
+                raise item
+            self._pending = memoryview(item)
+
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._closed_event.set()
+            self._thread.join()
+        super().close()
+
+
+def open_stream(path, compression=None, block_size=1024 * 1024, max_blocks=8):
+    return io.BufferedReader(
+        ThreadedDecompressor(path, compression, block_size=block_size, max_blocks=max_blocks),
+        buffer_size=block_size
+    )
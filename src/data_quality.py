@@ -1,6 +1,8 @@
 import pandas as pd
+import numpy as np
 import logging
 from datetime import datetime
+from src.normalize import normalize_keys
 
 
 logger = logging.getLogger(__name__)
@@ -11,7 +13,7 @@ class DataQualityChecker:
         self.checks_passed = []
         self.checks_failed = []
     def check_null_values(self, df, table_name, critical_columns, max_null_pct=10):
-        logger.info(f"Checking null values in {table_name}")
+        logger.info("Checking null values in %s", table_name)
         issues = []
         for col in critical_columns:
             if col not in df.columns:
@@ -32,17 +34,17 @@ class DataQualityChecker:
                 'table': table_name,
                 'issues': issues
             })
-            logger.warning(f"Null value check FAILED for {table_name}: {issues}")
+            logger.warning("Null value check FAILED for %s: %s", table_name, issues)
             return False
         else:
             self.checks_passed.append({
                 'checks': 'null_values',
                 'table': table_name
             })
-            logger.info(f"Null value check PASSED for {table_name}")
+            logger.info("Null value check PASSED for %s", table_name)
             return True
     def check_duplicates(self, df, table_name, unique_columns):
-        logger.info(f"Checking duplicates in {table_name}")
+        logger.info("Checking duplicates in %s", table_name)
         duplicate_count = df.duplicated(subset=unique_columns).sum()
 
         if duplicate_count > 0:
@@ -51,17 +53,17 @@ class DataQualityChecker:
                 'table': table_name,
                 'issues': [f"Found {duplicate_count} duplicate rows"]
             })
-            logger.warning(f"duplicate check FAILED for {table_name}: {duplicate_count} duplicates")
+            logger.warning("duplicate check FAILED for %s: %s duplicates", table_name, duplicate_count)
             return False
         else:
             self.checks_passed.append({
                 'check': 'duplicates',
                 'table': table_name
             })
-            logger.info(f"Duplicate check PASSED for {table_name}")
+            logger.info("Duplicate check PASSED for %s", table_name)
             return True
     def check_data_types(self, df, table_name, expected_type):
-        logger.info(f"Checking data types in {table_name}")
+        logger.info("Checking data types in %s", table_name)
         issues = []
         for col, expected_type in expected_type.items():
             if col not in df.columns:
@@ -84,19 +86,19 @@ class DataQualityChecker:
                 'table': table_name,
                 'issues': issues
             })
-            logger.warning(f"Data type checks FAILED for {table_name}: {issues}")
+            logger.warning("Data type checks FAILED for %s: %s", table_name, issues)
             return False
         else:
             self.checks_passed.append({
                 'checks': 'data_types',
                 'table': table_name
             })
-            logger.info(f"Data type checks PASSED for {table_name}")
+            logger.info("Data type checks PASSED for %s", table_name)
             return True
         
     def check_value_ranges(self, df, table_name, range_checks):
     
-        logger.info(f"Checking Value Ranges in {table_name}")
+        logger.info("Checking Value Ranges in %s", table_name)
         issues = []
         for col, ranges in range_checks.items():
             if col not in df.columns:
@@ -116,18 +118,18 @@ class DataQualityChecker:
                 'table': table_name,
                 'issues': issues
             })
-            logger.warning(f"Value range checks FAILED for {table_name}: {issues}")
+            logger.warning("Value range checks FAILED for %s: %s", table_name, issues)
             return False
         else:
             self.checks_passed.append({
                 'checks': 'value_ranges',
                 'table': table_name
             })
-            logger.info(f"value range checks PASSED for {table_name}")
+            logger.info("value range checks PASSED for %s", table_name)
             return True
         
     def check_row_count(self, df, table_name, min_rows=1):
-        logger.info(f"Checking Row count in {table_name}")
+        logger.info("Checking Row count in %s", table_name)
         row_count = len(df)
 
         if row_count < min_rows:
@@ -136,17 +138,74 @@ class DataQualityChecker:
                 'table': table_name,
                 'issues': [f"Only {row_count} rows (minimum: {min_rows})"]
             })
-            logger.warning(f"Row count checks FAILED for {table_name}")
+            logger.warning("Row count checks FAILED for %s", table_name)
             return False
         else:
             self.checks_passed.append({
                 'checks': 'row_count',
                 'table': table_name
             })
-            logger.info(f"row count checks PASSED for {table_name}: {row_count} rows")
+            logger.info("row count checks PASSED for %s: %s rows", table_name, row_count)
             return True
         
 
+    def _normalize_keys(self, series):
+        return normalize_keys(series).to_numpy(dtype=object)
+
+    def check_referential_integrity(self, child_df, child_table, child_key,
+                                    parent_df, parent_table, parent_key=None, max_orphan_pct=0):
+        parent_key = parent_key or child_key
+        logger.info("Checking referential integrity %s.%s -> %s.%s", child_table, child_key, parent_table, parent_key)
+        issues = []
+        for df, table, col in [(child_df, child_table, child_key), (parent_df, parent_table, parent_key)]:
+            if col not in df.columns:
+                issues.append(f"Column '{col}' tidak ada di {table}")
+        if issues:
+            self.checks_failed.append({
+                'check': 'referential_integrity',
+                'table': child_table,
+                'issues': issues
+            })
+            logger.warning("Referential integrity check FAILED for %s: %s", child_table, issues)
+            return False
+
+        # Sorted unique parent keys + searchsorted gives a vectorized membership
+        # test without materializing a merge of the two tables.
+        child_keys = self._normalize_keys(child_df[child_key])
+        parent_keys = np.unique(self._normalize_keys(parent_df[parent_key]))
+
+        if len(parent_keys) > 0 and len(child_keys) > 0:
+            positions = np.searchsorted(parent_keys, child_keys)
+            positions[positions == len(parent_keys)] = 0
+            found = parent_keys[positions] == child_keys
+        else:
+            found = np.zeros(len(child_keys), dtype=bool)
+
+        orphan_count = int((~found).sum())
+        total = len(child_keys)
+        orphan_pct = (orphan_count / total * 100) if total > 0 else 0
+        result = {
+            'check': 'referential_integrity',
+            'table': child_table,
+            'relation': f"{child_table}.{child_key} -> {parent_table}.{parent_key}",
+            'orphan_count': orphan_count,
+            'coverage_pct': round(100 - orphan_pct, 2),
+            'sample_orphans': list(pd.unique(child_keys[~found])[:5])
+        }
+
+        if orphan_pct > max_orphan_pct:
+            result['issues'] = [
+                f"Found {orphan_count} orphan rows ({orphan_pct:.2f}%) in {child_table}.{child_key} "
+                f"without match in {parent_table}.{parent_key} (threshold: {max_orphan_pct}%)"
+            ]
+            self.checks_failed.append(result)
+            logger.warning("Referential integrity check FAILED for %s: %s orphans", result['relation'], orphan_count)
+            return False
+        else:
+            self.checks_passed.append(result)
+            logger.info("Referential integrity check PASSED for %s: %s%% coverage", result['relation'], result['coverage_pct'])
+            return True
+
     def generate_report(self):
         total_checks = len(self.checks_passed) + len(self.checks_failed)
 
@@ -0,0 +1,88 @@
+import pandas as pd
+import numpy as np
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+# Month-first comes before day-first, as in pd.to_datetime: a sample whose
+# days are all <= 12 cannot tell them apart and keeps the pandas reading.
+# Day-first only wins when some value cannot be month-first.
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y/%m/%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%m-%d-%Y',
+    '%d-%m-%Y',
+    '%Y%m%d'
+]
+
+# Index 7 is the slot for NaT, which day_name() also reports as NaN.
+DAY_NAMES = np.array(
+    ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday', np.nan],
+    dtype=object
+)
+
+
+class DateParser:
+    def __init__(self, formats=None, sample_size=1000):
+        self.formats = formats or DATE_FORMATS
+        self.sample_size = sample_size
+        self._detected = {}
+        self._lock = threading.Lock()
+
+    def detect_format(self, values):
+        sample = pd.Index(values[:self.sample_size])
+        best_format, best_parsed = None, 0
+        for fmt in self.formats:
+            parsed = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+            if parsed > best_parsed:
+                best_format, best_parsed = fmt, parsed
+            if parsed == len(sample):
+                break
+        return best_format
+
+    def parse(self, series, column=None):
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+
+        # Orders cluster on a handful of dates, so each distinct string is
+        # parsed once and the result is broadcast back with take().
+        codes, uniques = pd.factorize(series)
+        uniques = uniques.astype(str)
+
+        column = column or series.name
+        fmt = self._detected.get(column)
+        parsed = None
+        if fmt:
+            parsed = pd.to_datetime(uniques, format=fmt, errors='coerce')
+            if len(uniques) and parsed.isna().all():
+                # The source switched formats; detect again below.
+                fmt, parsed = None, None
+
+        if fmt is None and len(uniques):
+            fmt = self.detect_format(uniques)
+            if fmt:
+                with self._lock:
+                    self._detected[column] = fmt
+                logger.info("Detected date format for '%s': %s", column, fmt)
+
+        if parsed is None:
+            if fmt:
+                parsed = pd.to_datetime(uniques, format=fmt, errors='coerce')
+            else:
+                parsed = pd.to_datetime(uniques, errors='coerce')
+
+        values = parsed.to_numpy(dtype='datetime64[ns]')
+        result = np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+        valid = codes >= 0
+        result[valid] = values[codes[valid]]
+        return pd.Series(result, index=series.index, name=series.name)
+
+    @staticmethod
+    def day_names(dates):
+        weekday = dates.dt.dayofweek.fillna(7).to_numpy(dtype=np.int64)
+        return pd.Series(DAY_NAMES[weekday], index=dates.index, name=dates.name)
@@ -0,0 +1,233 @@
+import pandas as pd
+import numpy as np
+import os
+import shutil
+import logging
+import tempfile
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+logger = logging.getLogger(__name__)
+
+# One tag per kind of value, so values that compare equal in pandas
+# (1, 1.0, True) share a key and values that do not (1, '1') never do.
+NUMBER_TAG = 'n'
+STRING_TAG = 's'
+DATETIME_TAG = 'd'
+OBJECT_TAG = 'o'
+NULL_TAG = '\x00'
+MAX_EXACT_INT = 2 ** 63
+
+
+def _number_text(value):
+    value = value.item() if isinstance(value, np.generic) else value
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < MAX_EXACT_INT:
+            return str(int(value))
+        return repr(value)
+    return str(int(value))
+
+
+def _null_text(value, distinct_nulls):
+    # Series.duplicated tells None, NaN, NA and NaT apart; the multi-column
+    # path of DataFrame.duplicated factorizes them all to one missing code.
+    if not distinct_nulls:
+        return NULL_TAG
+    if value is None:
+        return NULL_TAG + 'None'
+    if value is pd.NA:
+        return NULL_TAG + 'NA'
+    if isinstance(value, (datetime, np.datetime64)):
+        return NULL_TAG + 'NaT'
+    return NULL_TAG + 'nan'
+
+
+def _object_key(value, distinct_nulls):
+    if pd.isna(value) is True:
+        return _null_text(value, distinct_nulls)
+    if isinstance(value, str):
+        return STRING_TAG + value
+    if isinstance(value, (bool, int, float, np.number)):
+        return NUMBER_TAG + _number_text(value)
+    if isinstance(value, (datetime, np.datetime64)):
+        return DATETIME_TAG + str(pd.Timestamp(value).value)
+    return OBJECT_TAG + type(value).__name__ + ':' + repr(value)
+
+
+class ExternalDeduplicator:
+    def __init__(self, spill_dir, chunk_rows=1_000_000, merge_batch_rows=250_000):
+        self.spill_dir = spill_dir
+        self.chunk_rows = chunk_rows
+        self.merge_batch_rows = merge_batch_rows
+        os.makedirs(spill_dir, exist_ok=True)
+        logger.info("ExternalDeduplicator initialized with spill_dir: %s", spill_dir)
+
+    def column_keys(self, values, distinct_nulls=True):
+        missing = values.isna().to_numpy()
+        if pd.api.types.is_bool_dtype(values.dtype) and not missing.any():
+            text = NUMBER_TAG + values.astype('int64').astype(str)
+        elif pd.api.types.is_integer_dtype(values.dtype) and not missing.any():
+            text = NUMBER_TAG + values.astype(str)
+        elif pd.api.types.is_float_dtype(values.dtype):
+            floats = values.to_numpy(dtype='float64', na_value=np.nan)
+            whole = np.isfinite(floats) & (floats == np.round(floats)) & (np.abs(floats) < MAX_EXACT_INT)
+            digits = np.where(whole, np.where(whole, floats, 0).astype('int64').astype(str), floats.astype(str))
+            text = NUMBER_TAG + pd.Series(digits, index=values.index, dtype=object)
+        elif pd.api.types.is_datetime64_any_dtype(values.dtype):
+            text = DATETIME_TAG + pd.Series(values.to_numpy(dtype='datetime64[ns]').astype('int64'), index=values.index).astype(str)
+        elif pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+            text = STRING_TAG + values.astype(str)
+        else:
+            return values.map(lambda value: _object_key(value, distinct_nulls)).to_numpy(dtype=object)
+
+        keys = text.to_numpy(dtype=object)
+        if missing.any():
+            keys[missing] = [_null_text(value, distinct_nulls) for value in values.to_numpy(dtype=object)[missing]]
+        return keys
+
+    def build_keys(self, df, subset):
+        # Keys are strings so runs from different chunks sort and compare
+        # consistently. Every part is prefixed with its length, so no value
+        # can run into the next column.
+        distinct_nulls = len(subset) == 1
+        keys = None
+        for col in subset:
+            part = pd.Series(self.column_keys(df[col], distinct_nulls), dtype=object)
+            part = part.str.len().astype(str) + ':' + part
+            keys = part if keys is None else keys + part
+        return keys.to_numpy(dtype=object)
+
+    def _chunks(self, data):
+        if isinstance(data, pd.DataFrame):
+            for start in range(0, len(data), self.chunk_rows):
+                yield data.iloc[start:start + self.chunk_rows]
+        else:
+            yield from data
+
+    def _spill_runs(self, chunks, subset, work_dir, chunk_files=None):
+        run_files = []
+        dropped = []
+        seq_start = 0
+
+        for i, chunk in enumerate(chunks):
+            seq = np.arange(seq_start, seq_start + len(chunk), dtype=np.int64)
+            seq_start += len(chunk)
+
+            if chunk_files is not None:
+                # Streamed chunks exist nowhere else, so they wait on disk
+                # until the duplicates are known.
+                chunk_path = os.path.join(work_dir, f"chunk_{i:06d}.pkl")
+                chunk.to_pickle(chunk_path)
+                chunk_files.append((chunk_path, seq[0] if len(seq) else seq_start))
+
+            # A sorted run of (key, seq) with duplicates inside the chunk
+            # already resolved; a stable sort keeps the lowest seq first.
+            run = pd.DataFrame({'_key': self.build_keys(chunk, subset), '_seq': seq})
+            run = run.sort_values('_key', kind='stable')
+            duplicated = run['_key'].duplicated().to_numpy()
+            dropped.append(run['_seq'].to_numpy()[duplicated])
+            run = run[~duplicated]
+
+            run_path = os.path.join(work_dir, f"run_{i:06d}.parquet")
+            pq.write_table(
+                pa.Table.from_pandas(run, preserve_index=False),
+                run_path,
+                row_group_size=self.merge_batch_rows
+            )
+            run_files.append(run_path)
+
+        return run_files, dropped
+
+    def _merge_runs(self, run_files):
+        readers = [
+            pq.ParquetFile(path).iter_batches(batch_size=self.merge_batch_rows)
+            for path in run_files
+        ]
+        buffers = [None] * len(readers)
+        dropped = []
+
+        def refill(i):
+            while buffers[i] is None or len(buffers[i]) == 0:
+                batch = next(readers[i], None)
+                if batch is None:
+                    buffers[i] = None
+                    return
+                buffers[i] = batch.to_pandas()
+
+        for i in range(len(readers)):
+            refill(i)
+
+        while any(buf is not None for buf in buffers):
+            active = [i for i, buf in enumerate(buffers) if buf is not None]
+
+            # Every run holds each key at most once, so all copies of any key
+            # up to the smallest buffered tail key are in memory right now.
+            bound = min(buffers[i]['_key'].iloc[-1] for i in active)
+
+            pieces = []
+            for i in active:
+                buf = buffers[i]
+                take = (buf['_key'] <= bound).to_numpy()
+                pieces.append(buf[take])
+                buffers[i] = buf[~take]
+                refill(i)
+
+            merged = pd.concat(pieces, ignore_index=True).sort_values(['_key', '_seq'])
+            duplicated = merged['_key'].duplicated().to_numpy()
+            dropped.append(merged['_seq'].to_numpy()[duplicated])
+
+        return dropped
+
+    def _duplicate_positions(self, chunks, subset, work_dir, chunk_files=None):
+        run_files, dropped = self._spill_runs(chunks, subset, work_dir, chunk_files)
+        dropped.extend(self._merge_runs(run_files))
+        dropped = np.sort(np.concatenate(dropped)) if dropped else np.array([], dtype=np.int64)
+        logger.info("External dedup on %s: %s runs, %s duplicates", subset, len(run_files), len(dropped))
+        return dropped
+
+    def unique_mask(self, df, subset):
+        # True for the rows drop_duplicates(keep='first') keeps. Only keys
+        # and row positions are spilled; the frame is already in memory.
+        if isinstance(subset, str):
+            subset = [subset]
+
+        work_dir = tempfile.mkdtemp(prefix='dedup_', dir=self.spill_dir)
+        try:
+            dropped = self._duplicate_positions(self._chunks(df), subset, work_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        mask = np.ones(len(df), dtype=bool)
+        mask[dropped] = False
+        return mask
+
+    def iter_deduplicated(self, data, subset):
+        if isinstance(data, pd.DataFrame):
+            mask = self.unique_mask(data, subset)
+            for start in range(0, len(data), self.chunk_rows):
+                yield data.iloc[start:start + self.chunk_rows][mask[start:start + self.chunk_rows]]
+            return
+
+        if isinstance(subset, str):
+            subset = [subset]
+
+        work_dir = tempfile.mkdtemp(prefix='dedup_', dir=self.spill_dir)
+        try:
+            chunk_files = []
+            dropped = self._duplicate_positions(data, subset, work_dir, chunk_files)
+            for chunk_path, seq_start in chunk_files:
+                chunk = pd.read_pickle(chunk_path)
+                seq = np.arange(seq_start, seq_start + len(chunk), dtype=np.int64)
+                keep = ~np.isin(seq, dropped, assume_unique=True)
+                yield chunk[keep]
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def drop_duplicates(self, data, subset):
+        if isinstance(data, pd.DataFrame):
+            return data[self.unique_mask(data, subset)]
+        chunks = list(self.iter_deduplicated(data, subset))
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks)
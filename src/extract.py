@@ -1,64 +1,149 @@
 import pandas as pd
 import os
+import re
+import glob
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from src.compression import COMPRESSION_EXTENSIONS, detect_compression, open_stream
 
 
 logger = logging.getLogger(__name__)
 
 class DataExtractor:
-    def __init__(self, data_dir):
+    SOURCE_FILES = {
+        'orders': 'orders.csv',
+        'customers': 'customers.csv',
+        'order_items': 'order_item.csv',
+        'products': 'products.csv'
+    }
+
+    # Hive-style directories (date=2024-01-15/) or a date in the file name
+    # (orders_2024-01-15.csv.gz, orders_20240115.csv).
+    PARTITION_PATTERN = re.compile(r'([A-Za-z_]+)=([^/\\]+)')
+    FILE_DATE_PATTERN = re.compile(r'(\d{4})-?(\d{2})-?(\d{2})')
+
+    def __init__(self, data_dir, source_patterns=None, start_date=None, end_date=None, max_workers=4,
+                 stream_decompression=True):
         self.data_dir = data_dir
-        logger.info(f"DataExtractor initialized with data_dir: {data_dir}")
-    def extract_orders(self):
+        self.source_patterns = source_patterns or {}
+        self.start_date = pd.Timestamp(start_date).date() if start_date else None
+        self.end_date = pd.Timestamp(end_date).date() if end_date else None
+        self.max_workers = max_workers
+        self.stream_decompression = stream_decompression
+        logger.info("DataExtractor initialized with data_dir: %s", data_dir)
+
+    def partition_values(self, path):
+        relative = os.path.relpath(path, self.data_dir)
+        values = dict(self.PARTITION_PATTERN.findall(relative))
+
+        partition_date = values.get('date') or values.get('dt')
+        if partition_date is None and {'year', 'month', 'day'} <= values.keys():
+            partition_date = f"{values['year']}-{values['month']}-{values['day']}"
+        if partition_date is None:
+            match = self.FILE_DATE_PATTERN.search(os.path.basename(path))
+            if match:
+                partition_date = '-'.join(match.groups())
+
         try:
-            file_path = os.path.join(self.data_dir, "orders.csv")
-            logger.info(f"Extracting orders from {file_path}")
+            values['date'] = pd.Timestamp(partition_date).date() if partition_date else None
+        except ValueError:
+            values['date'] = None
+        return values
+
+    def _in_date_range(self, path):
+        partition_date = self.partition_values(path)['date']
+        if partition_date is None:
+            # Files without a date cannot be pruned safely.
+            return True
+        if self.start_date and partition_date < self.start_date:
+            return False
+        if self.end_date and partition_date > self.end_date:
+            return False
+        return True
+
+    def discover_files(self, name):
+        pattern = self.source_patterns.get(name)
+        if pattern is None:
+            path = os.path.join(self.data_dir, self.SOURCE_FILES[name])
+            if not os.path.exists(path):
+                # Fall back to a compressed export of the same file.
+                for extension in COMPRESSION_EXTENSIONS:
+                    if os.path.exists(path + extension):
+                        return [path + extension]
+            return [path]
+
+        files = sorted(glob.glob(os.path.join(self.data_dir, pattern), recursive=True))
+        selected = [path for path in files if os.path.isfile(path) and self._in_date_range(path)]
+        logger.info(
+            "Source '%s' matched %s files for pattern %s, %s after date pruning",
+            name, len(files), pattern, len(selected)
+        )
+        return selected
+
+    def get_source_paths(self):
+        return {name: self.discover_files(name) for name in self.SOURCE_FILES}
+
+    def read_file(self, path):
+        compression = detect_compression(path)
+        if compression and self.stream_decompression:
+            with open_stream(path, compression) as stream:
+                return pd.read_csv(stream, skipinitialspace=True)
+        # pandas infers any other compression from the extension.
+        return pd.read_csv(path, skipinitialspace=True)
+
+    def read_source(self, name):
+        files = self.discover_files(name)
+        if not files:
+            raise FileNotFoundError(f"No input files found for source '{name}'")
+        logger.info("Extracting %s from %s", name, files[0] if len(files) == 1 else f"{len(files)} files")
+
+        if len(files) == 1:
+            return self.read_file(files[0])
+
+        # Parsing releases the GIL for most of its work, so threads are
+        # enough to overlap reads of many small daily files.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            frames = list(executor.map(self.read_file, files))
+        return pd.concat(frames, ignore_index=True)
 
-            df=pd.read_csv(file_path, skipinitialspace=True)
-            logger.info(f"Successfully extracted {len(df)} orders")
+    def extract_orders(self):
+        try:
+            df = self.read_source('orders')
+            logger.info("Successfully extracted %s orders", len(df))
             return df
         except Exception as e:
-            logger.error(f"Failed to extract orders: {str(e)}")
+            logger.error("Failed to extract orders: %s", e)
             raise
 
     def extract_customers(self):
         try:
-            file_path = os.path.join(self.data_dir, "customers.csv")
-            logger.info(f"Extracting customers from {file_path}")
-
-            df = pd.read_csv(file_path, skipinitialspace=True)
-            logger.info(f"Successfully Extracted {len(df)} customers")
+            df = self.read_source('customers')
+            logger.info("Successfully Extracted %s customers", len(df))
 
             return df
         except Exception as e:
-            logger.error(f"Error extracting customers: {str(e)}")
+            logger.error("Error extracting customers: %s", e)
             raise
 
     def extract_order_item(self):
         try:
-            file_path = os.path.join(self.data_dir, "order_item.csv")
-            logger.info(f"Extracting order item from {file_path}")
-
-            df = pd.read_csv(file_path, skipinitialspace=True)
-            logger.info(f"Successfully extracted {len(df)} order item")
+            df = self.read_source('order_items')
+            logger.info("Successfully extracted %s order item", len(df))
 
             return df
         except Exception as e:
-            logger.error(f"Error extracting order item: {str(e)}")
+            logger.error("Error extracting order item: %s", e)
             raise
 
     def extract_products(self):
         try:
-            file_path = os.path.join(self.data_dir, "products.csv")
-            logger.info(f"Extracting products from {file_path}")
-
-            df = pd.read_csv(file_path, skipinitialspace=True)
-            logger.info(f"Successfully Extracted {len(df)} products")
+            df = self.read_source('products')
+            logger.info("Successfully Extracted %s products", len(df))
 
             return df
         except Exception as e:
-            logger.error(f"Error extracting products: {str(e)}")
+            logger.error("Error extracting products: %s", e)
             raise
 
     def extract_all(self):
@@ -70,7 +155,7 @@ class DataExtractor:
                 'products': self.extract_products()
             }
 
-            logger.info(f"Successfully Extracted all data sources")
+            logger.info("Successfully Extracted all data sources")
             return data
 
 
@@ -0,0 +1,272 @@
+import pandas as pd
+import os
+import json
+import time
+import asyncio
+import logging
+import functools
+from src.transform import DataTransformer
+
+
+logger = logging.getLogger(__name__)
+
+ORDER_FIELDS = ['order_id', 'customer_id', 'order_date', 'order_status', 'total_amount']
+ORDER_ITEM_FIELDS = ['order_item_id', 'order_id', 'product_id', 'quantity', 'price_per_unit']
+CUSTOMER_COLUMNS = ['customer_id', 'customer_name', 'city']
+PRODUCT_COLUMNS = ['product_id', 'product_name', 'category']
+
+
+def classify_record(record):
+    kind = record.pop('type', None)
+    if kind in ('order', 'order_item'):
+        return kind
+    if 'order_item_id' in record:
+        return 'order_item'
+    if 'order_id' in record:
+        return 'order'
+    return None
+
+
+class DirectorySource:
+    # Producers should write to a temporary name and rename to *.jsonl when
+    # the file is complete; files are moved to done/ only after every record
+    # in them has been committed to the warehouse.
+    def __init__(self, watch_dir, poll_interval=1.0):
+        self.watch_dir = watch_dir
+        self.done_dir = os.path.join(watch_dir, 'done')
+        self.poll_interval = poll_interval
+        self._in_flight = set()
+
+        os.makedirs(self.done_dir, exist_ok=True)
+        logger.info("DirectorySource watching %s", watch_dir)
+
+    def _pending_files(self):
+        return sorted(
+            os.path.join(self.watch_dir, name)
+            for name in os.listdir(self.watch_dir)
+            if name.endswith('.jsonl') and os.path.join(self.watch_dir, name) not in self._in_flight
+        )
+
+    def _mark_done(self, path):
+        os.replace(path, os.path.join(self.done_dir, os.path.basename(path)))
+        self._in_flight.discard(path)
+        logger.info("Ingested %s", os.path.basename(path))
+
+    async def run(self, queue, stop_event):
+        while not stop_event.is_set():
+            for path in self._pending_files():
+                self._in_flight.add(path)
+                with open(path, 'rb') as f:
+                    for line in f:
+                        # put() waits while the queue is full, which is what
+                        # slows reading down when the warehouse falls behind.
+                        await queue.put(('line', line))
+                await queue.put(('ack', functools.partial(self._mark_done, path)))
+                if stop_event.is_set():
+                    break
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+class SocketSource:
+    def __init__(self, host='127.0.0.1', port=8765, path=None):
+        self.host = host
+        self.port = port
+        self.path = path
+
+    async def run(self, queue, stop_event):
+        async def handle(reader, writer):
+            try:
+                while not stop_event.is_set():
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    # While put() waits nothing is read from the socket, so
+                    # the kernel buffers fill up and the sender blocks.
+                    await queue.put(('line', line))
+            finally:
+                writer.close()
+
+        if self.path:
+            server = await asyncio.start_unix_server(handle, path=self.path)
+            logger.info("SocketSource listening on %s", self.path)
+        else:
+            server = await asyncio.start_server(handle, self.host, self.port)
+            logger.info("SocketSource listening on %s:%s", self.host, self.port)
+
+        async with server:
+            await stop_event.wait()
+
+
+class MicroBatchIngestor:
+    def __init__(self, loader, transformer=None, batch_size=5000, flush_interval=5.0,
+                 max_pending=20000, dimension_refresh_seconds=60):
+        self.loader = loader
+        self.transformer = transformer or DataTransformer()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dimension_refresh_seconds = dimension_refresh_seconds
+
+        self.stop_event = None
+        self._orders = []
+        self._order_items = []
+        self._acks = []
+        self._dimensions = None
+        self._dimensions_loaded_at = 0
+        self.stats = {
+            'records_received': 0,
+            'records_rejected': 0,
+            'batches_flushed': 0,
+            'orders_written': 0,
+            'order_items_written': 0,
+            'fact_rows_written': 0
+        }
+        logger.info(
+            "MicroBatchIngestor initialized (batch_size=%s, flush_interval=%ss, max_pending=%s)",
+            batch_size, flush_interval, max_pending
+        )
+
+    def stop(self):
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+    def _pending_count(self):
+        return len(self._orders) + len(self._order_items)
+
+    def _add_line(self, line):
+        try:
+            record = json.loads(line)
+            kind = classify_record(record) if isinstance(record, dict) else None
+        except ValueError:
+            kind = None
+
+        if kind is None:
+            self.stats['records_rejected'] += 1
+            logger.warning("Rejected record: %.200s", line)
+            return
+
+        self.stats['records_received'] += 1
+        if kind == 'order':
+            self._orders.append(record)
+        else:
+            self._order_items.append(record)
+
+    async def run(self, source):
+        self.stop_event = asyncio.Event()
+        queue = asyncio.Queue(maxsize=self.max_pending)
+        producer = asyncio.create_task(source.run(queue, self.stop_event))
+        loop = asyncio.get_running_loop()
+        deadline = None
+
+        try:
+            while not (producer.done() and queue.empty()):
+                wait = 0.5 if deadline is None else min(max(deadline - loop.time(), 0), 0.5)
+                try:
+                    kind, payload = await asyncio.wait_for(queue.get(), timeout=wait)
+                except asyncio.TimeoutError:
+                    if deadline is not None and loop.time() >= deadline:
+                        await self.flush()
+                        deadline = None
+                    continue
+
+                if kind == 'ack':
+                    self._acks.append(payload)
+                    if self._pending_count() == 0:
+                        await self.flush()
+                    continue
+
+                self._add_line(payload)
+                if deadline is None and self._pending_count():
+                    deadline = loop.time() + self.flush_interval
+                if self._pending_count() >= self.batch_size:
+                    await self.flush()
+                    deadline = None
+
+            await self.flush()
+            # Appended rows keep the existing indexes current; only refresh
+            # planner statistics that have gone stale.
+            await asyncio.to_thread(self.loader.optimize)
+            producer.result()
+        finally:
+            self.stop_event.set()
+            if not producer.done():
+                producer.cancel()
+
+        logger.info("Ingestion stopped: %s", self.stats)
+        return self.stats
+
+    async def flush(self):
+        orders, order_items, acks = self._orders, self._order_items, self._acks
+        self._orders, self._order_items, self._acks = [], [], []
+
+        if orders or order_items:
+            # Transform and SQLite work is blocking, so it runs off the event
+            # loop; the loop keeps accepting records until the queue is full.
+            await asyncio.to_thread(self._write_batch, orders, order_items)
+
+        for ack in acks:
+            ack()
+
+    def _load_dimensions(self, conn):
+        if self._dimensions is None or time.monotonic() - self._dimensions_loaded_at > self.dimension_refresh_seconds:
+            dimensions = {}
+            for table, columns in [('customers', CUSTOMER_COLUMNS), ('products', PRODUCT_COLUMNS)]:
+                if self.loader.table_exists(table, conn):
+                    dimensions[table] = pd.read_sql_query(f"SELECT {', '.join(columns)} FROM {table}", conn)
+                else:
+                    dimensions[table] = pd.DataFrame(columns=columns)
+            self._dimensions = dimensions
+            self._dimensions_loaded_at = time.monotonic()
+        return self._dimensions
+
+    def _write_batch(self, orders, order_items):
+        start = time.perf_counter()
+        conn = self.loader.get_connection()
+        try:
+            affected = set()
+            if orders:
+                df_orders = self.transformer.transform_orders(pd.DataFrame(orders).reindex(columns=ORDER_FIELDS))
+                self.loader.upsert_dataframe(df_orders, 'orders', 'order_id', conn)
+                affected.update(df_orders['order_id'].astype(str))
+                self.stats['orders_written'] += len(df_orders)
+            if order_items:
+                df_items = self.transformer.transform_order_items(
+                    pd.DataFrame(order_items).reindex(columns=ORDER_ITEM_FIELDS)
+                )
+                self.loader.upsert_dataframe(df_items, 'order_items', 'order_item_id', conn)
+                affected.update(df_items['order_id'].astype(str))
+                self.stats['order_items_written'] += len(df_items)
+
+            # Items may arrive before or after their order, so the fact rows
+            # of every touched order are rebuilt from what the warehouse holds
+            # after this batch.
+            fact_rows = 0
+            all_orders = self.loader.read_rows('orders', 'order_id', affected, conn)
+            if len(all_orders):
+                all_items = self.loader.read_rows('order_items', 'order_id', affected, conn)
+                if all_items.empty:
+                    all_items = all_items.reindex(columns=ORDER_ITEM_FIELDS + ['total_item_price'])
+                dimensions = self._load_dimensions(conn)
+                fact = self.transformer.create_fact_sales(
+                    all_orders, all_items, dimensions['customers'], dimensions['products']
+                )
+                self.loader.upsert_dataframe(fact, 'fact_sales', 'order_id', conn)
+                fact_rows = len(fact)
+                self.stats['fact_rows_written'] += fact_rows
+
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error("Error flushing micro-batch: %s", e)
+            raise
+        finally:
+            conn.close()
+
+        self.stats['batches_flushed'] += 1
+        logger.info(
+            "Flushed micro-batch: %s orders, %s order items, %s fact rows in %.3fs",
+            len(orders), len(order_items), fact_rows, time.perf_counter() - start
+        )
@@ -0,0 +1,103 @@
+import io
+import numpy as np
+
+
+# One bit per reason, so a row can carry a drop reason and flags together
+# (e.g. an order with an unparseable date that was also a duplicate).
+DROP_REASONS = {
+    'missing_key': 1,
+    'duplicate': 2,
+    'negative_amount': 4,
+    'negative_quantity': 8,
+    'negative_price': 16
+}
+FLAG_REASONS = {
+    'bad_date': 32
+}
+REASON_BITS = {**DROP_REASONS, **FLAG_REASONS}
+DROP_MASK = sum(DROP_REASONS.values())
+
+# A dropped row has exactly one drop bit set, so its masked flags index
+# straight into this table.
+_DROP_LABELS = np.full(DROP_MASK + 1, None, dtype=object)
+for _reason, _bit in DROP_REASONS.items():
+    _DROP_LABELS[_bit] = _reason
+
+
+class RowLineage:
+    # flags holds one byte per input row, in the order the transform
+    # received them; positions maps the rows still alive back to it.
+    def __init__(self, n_rows):
+        self.flags = np.zeros(n_rows, dtype=np.uint8)
+        self.positions = np.arange(n_rows)
+        self.reasons = []
+
+    def __len__(self):
+        return len(self.flags)
+
+    def _mark(self, positions, reason):
+        if reason not in self.reasons:
+            self.reasons.append(reason)
+        self.flags[positions] |= REASON_BITS[reason]
+
+    def drop(self, df, keep, reason):
+        keep = np.asarray(keep, dtype=bool)
+        self._mark(self.positions[~keep], reason)
+        self.positions = self.positions[keep]
+        return df[keep]
+
+    def flag(self, mask, reason):
+        self._mark(self.positions[np.asarray(mask, dtype=bool)], reason)
+
+    def merge(self, part, positions):
+        # Folds in the lineage of a transform that ran on a slice of these
+        # rows (e.g. one shard); positions says where each of its rows sits.
+        for reason in part.reasons:
+            if reason not in self.reasons:
+                self.reasons.append(reason)
+        self.flags[positions] |= part.flags
+        self.positions = self.survivors()
+
+    def survivors(self):
+        return np.flatnonzero((self.flags & DROP_MASK) == 0)
+
+    def dropped(self):
+        positions = np.flatnonzero(self.flags & DROP_MASK)
+        return positions, _DROP_LABELS[self.flags[positions] & DROP_MASK]
+
+    def rows_with(self, reason):
+        return np.flatnonzero(self.flags & REASON_BITS[reason])
+
+    def counts(self):
+        dropped = self.flags & DROP_MASK
+        counts = {'rows_in': len(self.flags)}
+        for reason in self.reasons:
+            counts[reason] = int(np.count_nonzero(self.flags & REASON_BITS[reason]))
+        counts['rows_out'] = int(np.count_nonzero(dropped == 0))
+        return counts
+
+    def encode(self):
+        # Run-length encoding: almost every row is kept, so a run of clean
+        # rows, however long, costs one value and one length.
+        n = len(self.flags)
+        starts = np.flatnonzero(np.diff(self.flags)) + 1
+        starts = np.concatenate([[0], starts]) if n else starts
+        lengths = np.diff(np.append(starts, n))
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            values=self.flags[starts],
+            lengths=lengths.astype(np.uint32),
+            reasons=np.array(self.reasons, dtype=str)
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def decode(cls, payload):
+        with np.load(io.BytesIO(payload)) as data:
+            flags = np.repeat(data['values'], data['lengths'])
+            lineage = cls(len(flags))
+            lineage.flags = flags.astype(np.uint8)
+            lineage.reasons = data['reasons'].tolist()
+        lineage.positions = lineage.survivors()
+        return lineage
@@ -1,94 +1,472 @@
 import pandas as pd
+import pyarrow as pa
 import sqlite3
 import os
+import time
 import logging
+import threading
 from datetime import datetime
+from src.queries import ANALYTICS_QUERIES
+from src.lineage import RowLineage
 
 
 logger = logging.getLogger(__name__)
 
+INDEX_DEFINITIONS = {
+    'fact_sales': {
+        'idx_fact_sales_order_date': ['order_date'],
+        'idx_fact_sales_customer_id': ['customer_id'],
+        'idx_fact_sales_product_id': ['product_id'],
+        'idx_fact_sales_category': ['category']
+    }
+}
+
+STATS_TABLE = 'table_stats'
+LINEAGE_TABLE = 'transform_lineage'
+ROW_LINEAGE_TABLE = 'row_lineage'
+
 class DataLoader:
-    def __init__(self, db_path):
+    def __init__(self, db_path, snapshots=None):
         self.db_path = db_path
+        self.snapshots = snapshots
+        self.queries = {name: dict(spec) for name, spec in ANALYTICS_QUERIES.items()}
+        self._local = threading.local()
+        self._query_connections = []
+        self._connections_lock = threading.Lock()
 
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        logger.info(f"DataLoader initialized with db_path: {db_path}")
+        logger.info("DataLoader initialized with db_path: %s", db_path)
 
     def get_connection(self):
         return sqlite3.connect(self.db_path)
     
     def load_dataframe(self, df, table_name, if_exists='replace'):
         try:
-            logger.info(f"Loading {len(df)} rows to table '{table_name}'")
+            logger.info("Loading %s rows to table '%s'", len(df), table_name)
             conn = self.get_connection()
             df.to_sql(table_name, conn, if_exists=if_exists, index=False)
+            if if_exists == 'append':
+                self.adjust_table_stats(table_name, len(df), conn)
+            else:
+                self._set_table_stats(table_name, len(df), len(df.columns), conn)
+            conn.commit()
             conn.close()
-            logger.info(f"Successfully loaded data to '{table_name}'")
+            logger.info("Successfully loaded data to '%s'", table_name)
         except Exception as e:
-            logger.error(f"Error loading data to '{table_name}':{str(e)}")
+            logger.error("Error loading data to '%s':%s", table_name, e)
             raise
     def load_all(self, transformed_data):
         logger.info('Starting to load all data to warehouse')
 
         for table_name, df in transformed_data.items():
-            self.load_dataframe(df, table_name, if_exists='replace')
+            logger.info("Loading %s rows to table '%s'", len(df), table_name)
+            self.replace_table(df, table_name)
+            logger.info("Successfully loaded data to '%s'", table_name)
 
         logger.info("All data loaded successfully to warehouse.")
 
+    def table_exists(self, table_name, conn):
+        cursor = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+        return cursor.fetchone() is not None
+
+    def _stage_keys(self, conn, keys):
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS _staged_keys (key TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM _staged_keys")
+        conn.executemany("INSERT OR IGNORE INTO _staged_keys (key) VALUES (?)", [(str(k),) for k in keys])
+
+    def _to_rows(self, df):
+        values = df.copy()
+        for col in values.columns:
+            if pd.api.types.is_datetime64_any_dtype(values[col]):
+                values[col] = values[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+        values = values.astype(object).where(values.notna(), None)
+        return list(values.itertuples(index=False, name=None))
+
+    def insert_rows(self, df, table_name, conn):
+        # Appends inside the caller's transaction; to_sql would commit on
+        # its own and leave a partial write behind if a later step fails.
+        if not self.table_exists(table_name, conn):
+            conn.execute(pd.io.sql.get_schema(df, table_name, con=conn))
+        columns = ', '.join(df.columns)
+        placeholders = ', '.join('?' for _ in df.columns)
+        conn.executemany(f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})", self._to_rows(df))
+
+    def upsert_dataframe(self, df, table_name, key, conn):
+        # Rows whose key is already in the table are replaced. Unlike
+        # load_dataframe this never commits, so several tables can be
+        # updated in one transaction by the caller.
+        deleted = 0
+        if self.table_exists(table_name, conn):
+            self._stage_keys(conn, df[key].unique())
+            deleted = conn.execute(f"DELETE FROM {table_name} WHERE {key} IN (SELECT key FROM _staged_keys)").rowcount
+
+        self.insert_rows(df, table_name, conn)
+        self.adjust_table_stats(table_name, len(df) - deleted, conn, columns=len(df.columns))
+        logger.info("Upserted %s rows into '%s'", len(df), table_name)
+
+    def read_rows(self, table_name, key, keys, conn):
+        if not self.table_exists(table_name, conn):
+            return pd.DataFrame()
+        self._stage_keys(conn, keys)
+        return pd.read_sql_query(
+            f"SELECT * FROM {table_name} WHERE {key} IN (SELECT key FROM _staged_keys)", conn
+        )
+
+    def _ensure_stats_table(self, conn):
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+                table_name TEXT PRIMARY KEY,
+                row_count INTEGER,
+                column_count INTEGER,
+                size_bytes INTEGER,
+                updated_at TEXT
+            )""")
+
+    def _measure_size(self, table_name, conn):
+        # Pages of the table and its indexes, read from the dbstat virtual
+        # table; None when SQLite was built without it.
+        try:
+            return conn.execute(
+                "SELECT SUM(pgsize) FROM dbstat WHERE aggregate = TRUE "
+                "AND name IN (SELECT name FROM sqlite_master WHERE tbl_name = ?)",
+                (table_name,)
+            ).fetchone()[0]
+        except sqlite3.OperationalError:
+            return None
+
+    def _set_table_stats(self, table_name, row_count, column_count, conn):
+        # The loader already knows how many rows it wrote, so keeping this
+        # row current costs nothing compared with a COUNT(*) scan later.
+        self._ensure_stats_table(conn)
+        conn.execute(
+            f"INSERT OR REPLACE INTO {STATS_TABLE} VALUES (?, ?, ?, ?, ?)",
+            (table_name, row_count, column_count, self._measure_size(table_name, conn),
+             datetime.now().isoformat(timespec='seconds'))
+        )
+
+    def adjust_table_stats(self, table_name, delta, conn, columns=None):
+        # The row count moves by delta; the column count and size are
+        # re-read, since an upsert can add columns and always adds pages.
+        self._ensure_stats_table(conn)
+        column_count = columns or len(conn.execute(f"PRAGMA table_info({table_name})").fetchall())
+        updated = conn.execute(
+            f"UPDATE {STATS_TABLE} SET row_count = row_count + ?, column_count = ?, size_bytes = ?, "
+            f"updated_at = ? WHERE table_name = ?",
+            (delta, column_count, self._measure_size(table_name, conn),
+             datetime.now().isoformat(timespec='seconds'), table_name)
+        ).rowcount
+        if not updated:
+            # First write through an incremental path: count once, then
+            # keep the figure current from here on.
+            row_count = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            self._set_table_stats(table_name, row_count, column_count, conn)
+
+    def get_table_stats(self):
+        # Row counts and sizes without scanning any table: the loader's own
+        # table_stats first, then the sampled counts ANALYZE keeps in
+        # sqlite_stat1 for tables written by something else.
+        conn = self.get_connection()
+        try:
+            tables = [row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )]
+            stats = {}
+            if STATS_TABLE in tables:
+                for name, rows, columns, size, updated_at in conn.execute(f"SELECT * FROM {STATS_TABLE}"):
+                    stats[name] = {'row_count': rows, 'column_count': columns, 'size_bytes': size,
+                                   'updated_at': updated_at, 'source': STATS_TABLE}
+            if self.table_exists('sqlite_stat1', conn):
+                # Every row of a table in sqlite_stat1 starts with its row count.
+                for name, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+                    if name not in stats:
+                        stats[name] = {'row_count': int(stat.split()[0]), 'source': 'sqlite_stat1'}
+
+            records = [{'table_name': name, **stats.get(name, {'source': None})}
+                       for name in tables if name != STATS_TABLE]
+            result = pd.DataFrame(records, columns=[
+                'table_name', 'row_count', 'column_count', 'size_bytes', 'updated_at', 'source'
+            ])
+            return result.astype({'row_count': 'Int64', 'column_count': 'Int64', 'size_bytes': 'Int64'})
+        finally:
+            conn.close()
+
     def get_table_info(self):
         try:
+            stats = self.get_table_stats()
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
-
             table_info = {}
-            for (table_name,) in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                count = cursor.fetchone()[0]
-                table_info[table_name] = count
+            for table_name, count, source in stats[['table_name', 'row_count', 'source']].itertuples(index=False):
+                if source != STATS_TABLE:
+                    # Only tables the loader has never written are counted.
+                    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+                    count = cursor.fetchone()[0]
+                table_info[table_name] = int(count)
             cursor.close()
+            conn.close()
             return table_info
         except Exception as e:
-            logger.info(f"Error getting table info: {str(e)}")
+            logger.info("Error getting table info: %s", e)
             raise
-    
-    def execute_query(self, query):
+
+    def record_lineage(self, run_id, lineage):
+        # Counters go to transform_lineage for quick summaries; the per-row
+        # flags are stored run-length encoded, a few bytes per run of rows.
+        rows = [
+            {'run_id': run_id, 'transform': transform, 'metric': metric, 'rows': count}
+            for transform, row_lineage in lineage.items()
+            for metric, count in row_lineage.counts().items()
+        ]
+        if not rows:
+            return 0
+        self.load_dataframe(pd.DataFrame(rows), LINEAGE_TABLE, if_exists='append')
+        self.load_dataframe(
+            pd.DataFrame([
+                {'run_id': run_id, 'transform': transform, 'rows_in': len(row_lineage), 'flags': row_lineage.encode()}
+                for transform, row_lineage in lineage.items()
+            ]),
+            ROW_LINEAGE_TABLE,
+            if_exists='append'
+        )
+        return len(rows)
+
+    def load_rejected(self, rejected, run_id):
+        # All quarantined rows of a run go in with one bulk insert per
+        # rejected_<table> and one commit, so a failure leaves no partial
+        # run behind for --resume to append to again. Earlier runs are
+        # kept, tagged by run_id, so rejects can be reviewed or replayed later.
+        conn = self.get_connection()
         try:
-            conn = self.get_connection()
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                loaded = {}
+                for table, df in rejected.items():
+                    if df.empty:
+                        continue
+                    name = f"rejected_{table}"
+                    df = df.assign(run_id=run_id)
+                    self.insert_rows(df, name, conn)
+                    self.adjust_table_stats(name, len(df), conn)
+                    loaded[name] = len(df)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            if loaded:
+                logger.info("Loaded rejected rows: %s", loaded)
+            return loaded
+        except Exception as e:
+            logger.error("Error loading rejected rows: %s", e)
+            raise
+        finally:
+            conn.close()
+
+    def read_row_lineage(self, transform, run_id=None):
+        conn = self.get_connection()
+        try:
+            if not self.table_exists(ROW_LINEAGE_TABLE, conn):
+                return None
+            if run_id is None:
+                run_id = conn.execute(f"SELECT MAX(run_id) FROM {ROW_LINEAGE_TABLE}").fetchone()[0]
+            row = conn.execute(
+                f"SELECT flags FROM {ROW_LINEAGE_TABLE} WHERE run_id = ? AND transform = ?", (run_id, transform)
+            ).fetchone()
+            return RowLineage.decode(row[0]) if row else None
+        finally:
+            conn.close()
+
+    def read_lineage(self, run_id=None):
+        conn = self.get_connection()
+        try:
+            if not self.table_exists(LINEAGE_TABLE, conn):
+                return pd.DataFrame(columns=['run_id', 'transform', 'metric', 'rows'])
+            if run_id is None:
+                run_id = conn.execute(f"SELECT MAX(run_id) FROM {LINEAGE_TABLE}").fetchone()[0]
+            return pd.read_sql_query(
+                f"SELECT * FROM {LINEAGE_TABLE} WHERE run_id = ?", conn, params=(run_id,)
+            )
+        finally:
+            conn.close()
+
+    def register_query(self, name, sql, **defaults):
+        self.queries[name] = {'sql': sql, 'params': defaults}
+
+    def enable_wal(self):
+        # WAL lets readers keep running while a load commits; the mode is
+        # stored in the database file, so it only has to be set once.
+        conn = self.get_connection()
+        try:
+            return conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        finally:
+            conn.close()
+
+    def connect_read_only(self):
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro",
+            uri=True,
+            cached_statements=256,
+            check_same_thread=False
+        )
+        conn.execute("PRAGMA mmap_size = 268435456")
+        return conn
+
+    def get_query_connection(self):
+        # One long-lived read-only connection per thread. sqlite3 caches
+        # prepared statements per connection, so re-running a registered
+        # query skips parsing and planning.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self.connect_read_only()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._query_connections.append(conn)
+        return conn
+
+    def bind_params(self, name, params):
+        if name not in self.queries:
+            raise KeyError(f"Unknown query '{name}'")
+        spec = self.queries[name]
+        unknown = set(params) - set(spec['params'])
+        if unknown:
+            raise ValueError(f"Unknown parameters for query '{name}': {sorted(unknown)}")
+        return spec['sql'], {**spec['params'], **params}
+
+    def connect_snapshot(self, as_of):
+        if self.snapshots is None:
+            raise ValueError("Snapshots are not enabled for this DataLoader")
+        return self.snapshots.connect(as_of)
+
+    def run_query(self, name, as_of=None, **params):
+        sql, bound = self.bind_params(name, params)
+        conn = None
+        try:
+            conn = self.get_query_connection() if as_of is None else self.connect_snapshot(as_of)
+            cursor = conn.execute(sql, bound)
+            columns = [col[0] for col in cursor.description]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+        except Exception as e:
+            logger.info("Error running query '%s': %s", name, e)
+            raise
+        finally:
+            # Snapshot connections are opened per query; the live one is reused.
+            if as_of is not None and conn is not None:
+                conn.close()
+
+    def stream_query(self, name, batch_size=10_000, arrow=False, as_of=None, **params):
+        # Yields DataFrames (or Arrow record batches) of at most batch_size
+        # rows, so large results never have to fit in memory at once.
+        sql, bound = self.bind_params(name, params)
+        conn = self.get_query_connection() if as_of is None else self.connect_snapshot(as_of)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, bound)
+            columns = [col[0] for col in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if arrow:
+                    yield pa.RecordBatch.from_pydict(dict(zip(columns, map(list, zip(*rows)))))
+                else:
+                    yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        finally:
+            cursor.close()
+            if as_of is not None:
+                conn.close()
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._query_connections:
+                conn.close()
+            self._query_connections = []
+        self._local = threading.local()
+
+    def execute_query(self, query, as_of=None):
+        # as_of names a pipeline run; the query then sees the tables exactly
+        # as that run loaded them.
+        try:
+            conn = self.get_connection() if as_of is None else self.connect_snapshot(as_of)
             df = pd.read_sql_query(query, conn)
             conn.close()
             return df
         except Exception as e:
-            logger.info(f"Error executing query: {str(e)}")
+            logger.info("Error executing query: %s", e)
+            raise
+    def build_indexes(self, table_name, conn):
+        # Only indexes that do not exist yet are built. Rows appended to an
+        # indexed table are maintained by SQLite incrementally, so nothing
+        # is rebuilt unless the table itself was replaced.
+        start = time.perf_counter()
+        created = []
+        for index_name, columns in INDEX_DEFINITIONS.get(table_name, {}).items():
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='index' AND name=?", (index_name,)
+            ).fetchone()
+            if exists is None:
+                conn.execute(f"CREATE INDEX {index_name} ON {table_name}({', '.join(columns)})")
+                created.append(index_name)
+        if created:
+            logger.info("Built %s indexes on '%s' in %.3fs", len(created), table_name, time.perf_counter() - start)
+        return created
+
+    def replace_table(self, df, table_name):
+        # The new data is written to a staging table first; the old table is
+        # then dropped, the staging table renamed and its indexes built in
+        # bulk, all in one transaction, so readers never see a half-loaded or
+        # unindexed table.
+        staging = f"{table_name}__staging"
+        conn = self.get_connection()
+        try:
+            df.to_sql(staging, conn, if_exists='replace', index=False)
+
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+                conn.execute(f"ALTER TABLE {staging} RENAME TO {table_name}")
+                self.build_indexes(table_name, conn)
+                conn.execute(f"ANALYZE {table_name}")
+                self._set_table_stats(table_name, len(df), len(df.columns), conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            logger.error("Error loading data to '%s':%s", table_name, e)
             raise
+        finally:
+            conn.close()
+
+    def optimize(self):
+        conn = self.get_connection()
+        try:
+            # Re-analyzes only tables whose statistics have gone stale.
+            conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+
     def create_indexes(self):
         logger.info("Creating Indexes.....")
 
         try:
             conn = self.get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_fact_sales_order_date ON fact_sales(order_date)
-                           """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_fact_sales_customer_id ON fact_sales(customer_id)
-                           """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_fact_sales_product_id ON fact_sales(product_id)
-                           """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_fact_sales_category ON fact_sales(category)
-                           """)
-            
+            created = []
+            for table_name in INDEX_DEFINITIONS:
+                if self.table_exists(table_name, conn):
+                    created += self.build_indexes(table_name, conn)
             conn.commit()
             conn.close()
 
-            logger.info("Indexes created successfully")
+            self.optimize()
+            if created:
+                logger.info("Indexes created successfully: %s", created)
+            else:
+                logger.info("All indexes already up to date")
+            return created
         except Exception as e:
-            logger.info(f"Error creating indexes: {str(e)}")
+            logger.info("Error creating indexes: %s", e)
             raise
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+import copy
+import json
+import queue
+import logging
+import logging.handlers
+from datetime import datetime
+
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+IMMUTABLE_ARG_TYPES = (str, bytes, int, float, complex, bool, type(None), datetime)
+
+
+def _snapshot_args(args):
+    if isinstance(args, tuple):
+        if all(isinstance(arg, IMMUTABLE_ARG_TYPES) for arg in args):
+            return args
+        return tuple(arg if isinstance(arg, IMMUTABLE_ARG_TYPES) else copy.deepcopy(arg) for arg in args)
+    return copy.deepcopy(args)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The stock QueueHandler renders the message on the calling thread.
+    # Keeping msg/args as-is moves that work to the listener thread; only the
+    # traceback is rendered here because it cannot be rebuilt later. Mutable
+    # args (e.g. a stats dict) are copied so they render with the values
+    # they had at the call; anything that cannot be copied is rendered now.
+    def prepare(self, record):
+        if record.args:
+            try:
+                record.args = _snapshot_args(record.args)
+            except Exception:
+                record.msg = record.getMessage()
+                record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(log_file, level=logging.INFO, console=True):
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(JsonLinesFormatter())
+    handlers = [file_handler]
+
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(stream_handler)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener.start()
+    return listener
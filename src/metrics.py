@@ -0,0 +1,137 @@
+import pandas as pd
+import os
+import json
+import time
+import logging
+import functools
+import threading
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+logger = logging.getLogger(__name__)
+
+def get_peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def count_rows(value):
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(v) for v in value.values() if isinstance(v, pd.DataFrame))
+    return 0
+
+
+class PipelineMetrics:
+    EXCLUDED_METHODS = {
+        'get_connection', 'get_query_connection', 'get_source_paths', 'discover_files', 'partition_values',
+        'bind_params', 'table_exists', 'adjust_table_stats', 'insert_rows'
+    }
+
+    def __init__(self, run_id=None):
+        # Microseconds keep two runs started in the same second apart; run
+        # ids key lineage, quarantined rows and snapshots.
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        self.started_at = datetime.now()
+        self.calls = []
+        self._lock = threading.Lock()
+        logger.info("PipelineMetrics initialized for run: %s", self.run_id)
+
+    def instrument(self, obj, component):
+        for name in dir(type(obj)):
+            if name.startswith('_') or name in self.EXCLUDED_METHODS:
+                continue
+            attr = getattr(obj, name)
+            if callable(attr) and not isinstance(attr, type):
+                setattr(obj, name, self._wrap(attr, component, name))
+        return obj
+
+    def _wrap(self, func, component, method_name):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rows_in = sum(count_rows(arg) for arg in list(args) + list(kwargs.values()))
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            status = 'ok'
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except Exception:
+                status = 'failed'
+                raise
+            finally:
+                wall = time.perf_counter() - wall_start
+                rows_out = count_rows(result)
+                self.record({
+                    'component': component,
+                    'method': method_name,
+                    'status': status,
+                    'wall_seconds': round(wall, 6),
+                    'cpu_seconds': round(time.thread_time() - cpu_start, 6),
+                    'peak_rss_mb': get_peak_rss_mb(),
+                    'rows_in': rows_in,
+                    'rows_out': rows_out,
+                    'rows_per_sec': round(max(rows_in, rows_out) / wall, 2) if wall > 0 else None
+                })
+        return wrapper
+
+    def record(self, entry):
+        with self._lock:
+            self.calls.append(entry)
+
+    def build_report(self, status, stages=None, critical_path=None):
+        finished_at = datetime.now()
+        return {
+            'run_id': self.run_id,
+            'status': status,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': finished_at.isoformat(),
+            'duration_seconds': round((finished_at - self.started_at).total_seconds(), 3),
+            'peak_rss_mb': get_peak_rss_mb(),
+            'stages': stages or {},
+            'critical_path': critical_path or [],
+            'calls': self.calls
+        }
+
+    def write_json(self, report, report_dir):
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f"run_report_{self.run_id}.json")
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        logger.info("Run report written to %s", path)
+        return path
+
+    def write_to_warehouse(self, report, loader, table_name='pipeline_runs'):
+        row = pd.DataFrame([{
+            'run_id': report['run_id'],
+            'status': report['status'],
+            'started_at': report['started_at'],
+            'finished_at': report['finished_at'],
+            'duration_seconds': report['duration_seconds'],
+            'peak_rss_mb': report['peak_rss_mb'],
+            # load_all swaps each warehouse table in through replace_table.
+            'rows_loaded': sum(
+                call['rows_in'] for call in report['calls']
+                if call['component'] == 'load' and call['method'] == 'replace_table'
+            ),
+            'report_json': json.dumps(report, default=str)
+        }])
+        loader.load_dataframe(row, table_name, if_exists='append')
+
+    def log_summary(self):
+        logger.info("Method metrics:")
+        for call in self.calls:
+            logger.info(
+                "  - %-40s wall=%.3fs cpu=%.3fs rows_in=%s rows_out=%s",
+                f"{call['component']}.{call['method']}",
+                call['wall_seconds'], call['cpu_seconds'], call['rows_in'], call['rows_out']
+            )
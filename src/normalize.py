@@ -0,0 +1,49 @@
+import pandas as pd
+import numpy as np
+
+
+CARDINALITY_SAMPLE_SIZE = 10_000
+MAX_UNIQUE_RATIO = 0.5
+
+
+def is_low_cardinality(series):
+    step = max(len(series) // CARDINALITY_SAMPLE_SIZE, 1)
+    sample = series.iloc[::step]
+    return sample.nunique(dropna=False) <= MAX_UNIQUE_RATIO * len(sample)
+
+
+def map_unique(series, func):
+    # Apply a vectorized Series -> Series function to each distinct value
+    # once and broadcast the results back, so the cost follows the column's
+    # cardinality instead of its row count. Near-unique columns such as
+    # primary keys gain nothing from factorizing and go row by row.
+    if not is_low_cardinality(series):
+        return func(series)
+
+    codes, uniques = pd.factorize(series)
+    mapped = func(pd.Series(uniques)).to_numpy(dtype=object)
+
+    result = np.empty(len(codes), dtype=object)
+    valid = codes >= 0
+    result[valid] = mapped[codes[valid]]
+
+    # factorize drops missing values; run them through func directly so
+    # None/NaN come out exactly as the row-wise version would return them.
+    if not valid.all():
+        result[~valid] = func(series[~valid]).to_numpy(dtype=object)
+
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def normalize_strings(series, *operations):
+    # operations are pandas .str method names applied in order,
+    # e.g. normalize_strings(s, 'lower', 'strip').
+    def apply(values):
+        for op in operations:
+            values = getattr(values.str, op)()
+        return values
+    return map_unique(series, apply)
+
+
+def normalize_keys(series):
+    return map_unique(series, lambda values: values.astype(str).str.strip())
@@ -0,0 +1,212 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+logger = logging.getLogger(__name__)
+
+def _timed_call(func, args):
+    # Module-level so it can be pickled when the DAG runs on a process pool.
+    start = time.perf_counter()
+    result = func(*args)
+    return result, start, time.perf_counter()
+
+
+class PipelineTask:
+    def __init__(self, name, func, inputs=None, depends_on=None, side_effect=False, state=None):
+        self.name = name
+        self.func = func
+        self.side_effect = side_effect
+        self.state = state
+        self.inputs = list(inputs or [])
+        self.depends_on = self.inputs + [dep for dep in (depends_on or []) if dep not in self.inputs]
+        self.start_time = None
+        self.end_time = None
+        self.status = 'pending'
+
+    @property
+    def duration(self):
+        if self.start_time is None or self.end_time is None:
+            return 0.0
+        return self.end_time - self.start_time
+
+
+class PipelineDAG:
+    def __init__(self, max_workers=4, executor_class=ThreadPoolExecutor, checkpoint=None, resume=False,
+                 profiler=None):
+        self.max_workers = max_workers
+        self.executor_class = executor_class
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.profiler = profiler
+        self.tasks = {}
+        self.results = {}
+        self.run_start = None
+        logger.info("PipelineDAG initialized with max_workers: %s", max_workers)
+
+    def add_task(self, name, func, inputs=None, depends_on=None, side_effect=False, state=None):
+        # state is a (dump, restore) pair for anything a task leaves behind
+        # besides its result; it is checkpointed with the result and handed
+        # back to restore when the task is not re-run.
+        if name in self.tasks:
+            raise ValueError(f"Task '{name}' already registered")
+        self.tasks[name] = PipelineTask(name, func, inputs, depends_on, side_effect, state)
+        return self.tasks[name]
+
+    def topological_order(self):
+        for task in self.tasks.values():
+            for dep in task.depends_on:
+                if dep not in self.tasks:
+                    raise ValueError(f"Task '{task.name}' depends on unknown task '{dep}'")
+
+        order = []
+        visited = {}
+
+        def visit(name):
+            state = visited.get(name)
+            if state == 'done':
+                return
+            if state == 'visiting':
+                raise ValueError(f"Cycle detected at task '{name}'")
+            visited[name] = 'visiting'
+            for dep in self.tasks[name].depends_on:
+                visit(dep)
+            visited[name] = 'done'
+            order.append(name)
+
+        for name in self.tasks:
+            visit(name)
+        return order
+
+    def plan_resume(self):
+        if not (self.resume and self.checkpoint):
+            return {}
+
+        # A checkpoint only counts when everything before it does too. Tasks
+        # that write outside the pipeline (the warehouse, snapshots) are only
+        # trusted from the interrupted run itself: after a finished run the
+        # warehouse may have changed since, so they always run again.
+        completed = set()
+        for name in self.topological_order():
+            task = self.tasks[name]
+            if task.side_effect and not self.checkpoint.interrupted:
+                continue
+            if task.state and not self.checkpoint.has_state(name):
+                continue
+            if self.checkpoint.has(name) and all(dep in completed for dep in task.depends_on):
+                completed.add(name)
+        plan = {name: 'skip' for name in completed}
+
+        # A completed task only has to be restored when a task that still
+        # needs to run consumes its output.
+        for name, task in self.tasks.items():
+            if name in completed:
+                continue
+            for dep in task.inputs:
+                if dep in completed:
+                    plan[dep] = 'restore'
+        return plan
+
+    def run(self):
+        self.topological_order()
+        self.results = {}
+        self.run_start = time.perf_counter()
+        remaining = dict(self.tasks)
+        running = {}
+
+        plan = {}
+        if self.checkpoint:
+            self.checkpoint.begin(self.resume)
+            plan = self.plan_resume()
+
+        for name, action in plan.items():
+            task = remaining.pop(name)
+            if action == 'restore':
+                self.results[name] = self.checkpoint.load(name)
+                task.status = 'restored'
+            else:
+                self.results[name] = None
+                task.status = 'skipped'
+            if task.state:
+                task.state[1](self.checkpoint.load_state(name))
+            logger.info("Task '%s' %s from checkpoint", name, task.status)
+
+        logger.info("Running %s tasks", len(self.tasks))
+        with self.executor_class(max_workers=self.max_workers) as executor:
+            while remaining or running:
+                ready = [
+                    task for task in remaining.values()
+                    if all(dep in self.results for dep in task.depends_on)
+                ]
+                for task in ready:
+                    del remaining[task.name]
+                    args = [self.results[dep] for dep in task.inputs]
+                    task.status = 'running'
+                    logger.info("Task '%s' started", task.name)
+                    func = self.profiler.wrap(task.name, task.func) if self.profiler else task.func
+                    task.start_time = time.perf_counter()
+                    running[executor.submit(_timed_call, func, args)] = task
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        result, task.start_time, task.end_time = future.result()
+                        self.results[task.name] = result
+                    except Exception as e:
+                        task.end_time = time.perf_counter()
+                        task.status = 'failed'
+                        logger.error("Task '%s' failed: %s", task.name, e)
+                        for pending in running:
+                            pending.cancel()
+                        raise
+                    task.status = 'done'
+                    if self.checkpoint:
+                        self.checkpoint.save(task.name, result, state=task.state[0]() if task.state else None)
+                    logger.info("Task '%s' completed in %.3fs", task.name, task.duration)
+
+        if self.checkpoint:
+            self.checkpoint.complete()
+        return self.results
+
+    def critical_path(self):
+        finish = {}
+        previous = {}
+        for name in self.topological_order():
+            task = self.tasks[name]
+            best = None
+            for dep in task.depends_on:
+                if best is None or finish[dep] > finish[best]:
+                    best = dep
+            finish[name] = task.duration + (finish[best] if best else 0.0)
+            previous[name] = best
+
+        if not finish:
+            return [], 0.0
+
+        last = max(finish, key=finish.get)
+        path = []
+        while last is not None:
+            path.append(last)
+            last = previous[last]
+        path.reverse()
+        return path, finish[path[-1]]
+
+    def get_task_timings(self):
+        timings = {}
+        for name, task in self.tasks.items():
+            timings[name] = {
+                'status': task.status,
+                'start_offset': (task.start_time - self.run_start) if task.start_time and self.run_start else None,
+                'duration': task.duration,
+                'depends_on': task.depends_on
+            }
+        return timings
+
+    def log_summary(self):
+        logger.info("Task timings:")
+        for name, task in self.tasks.items():
+            logger.info("  - %-25s %-8s %8.3fs", name, task.status, task.duration)
+
+        path, total = self.critical_path()
+        logger.info("Critical path (%.3fs): %s", total, ' -> '.join(path))
@@ -0,0 +1,91 @@
+import os
+import io
+import pstats
+import cProfile
+import logging
+import functools
+import tracemalloc
+
+
+logger = logging.getLogger(__name__)
+
+# Keep the profiler's own bookkeeping out of the allocation reports.
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+]
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+
+class StageProfiler:
+    def __init__(self, output_dir, enabled=False, top_n=25, trace_frames=1):
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.top_n = top_n
+        self.trace_frames = trace_frames
+        self.summary = {}
+
+        if enabled:
+            os.makedirs(output_dir, exist_ok=True)
+            logger.info("StageProfiler enabled, writing profiles to %s", output_dir)
+
+    def start(self):
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+
+    def stop(self):
+        if self.enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def wrap(self, stage, func):
+        # Disabled profiling hands back the original callable, so there is
+        # no per-call cost at all.
+        if not self.enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = cProfile.Profile()
+            before = take_snapshot() if tracemalloc.is_tracing() else None
+            if before is not None:
+                tracemalloc.reset_peak()
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                peak = tracemalloc.get_traced_memory()[1] if before is not None else None
+                self._dump(stage, profile, before, peak)
+        return wrapper
+
+    def _dump(self, stage, profile, before, peak):
+        try:
+            profile.dump_stats(os.path.join(self.output_dir, f"{stage}.prof"))
+
+            stream = io.StringIO()
+            stats = pstats.Stats(profile, stream=stream)
+            stats.sort_stats('cumulative').print_stats(self.top_n)
+            with open(os.path.join(self.output_dir, f"{stage}_cpu.txt"), 'w') as f:
+                f.write(stream.getvalue())
+
+            entry = {'total_calls': stats.total_calls, 'total_seconds': round(stats.total_tt, 4)}
+
+            if before is not None:
+                after = take_snapshot()
+                top_stats = after.compare_to(before, 'lineno')[:self.top_n]
+                with open(os.path.join(self.output_dir, f"{stage}_alloc.txt"), 'w') as f:
+                    f.write(f"Peak traced memory during {stage}: {peak / 1024 / 1024:.2f} MB\n\n")
+                    for stat in top_stats:
+                        f.write(f"{stat}\n")
+                entry['peak_traced_mb'] = round(peak / 1024 / 1024, 2)
+
+            self.summary[stage] = entry
+            logger.info("Profile written for stage '%s': %s", stage, entry)
+        except Exception as e:
+            logger.warning("Could not write profile for stage '%s': %s", stage, e)
@@ -0,0 +1,114 @@
+# Named analytics queries registered on every DataLoader. Parameters use
+# sqlite's :name placeholders; 'params' holds the defaults, which reproduce
+# the original dashboard. A None date bound means "no bound".
+
+DATE_FILTER = """
+        AND (:start_date IS NULL OR order_date >= :start_date)
+        AND (:end_date IS NULL OR order_date < DATE(:end_date, '+1 day'))"""
+
+DATE_RANGE = {'start_date': None, 'end_date': None}
+
+ANALYTICS_QUERIES = {
+    'top_products': {
+        'sql': f"""
+    SELECT
+        product_name,
+        category,
+        SUM(total_item_price) as total_revenue,
+        SUM(quantity) as total_quantity,
+        COUNT(DISTINCT order_id) as total_orders
+    FROM fact_sales
+    WHERE order_status = :order_status{DATE_FILTER}
+    GROUP BY product_name, category
+    ORDER BY total_revenue DESC
+    LIMIT :limit
+    """,
+        'params': {'order_status': 'delivered', 'limit': 5, **DATE_RANGE}
+    },
+    'sales_by_category': {
+        'sql': f"""
+    SELECT
+        category,
+        COUNT(DISTINCT order_id) as total_orders,
+        SUM(quantity) as total_items,
+        SUM(total_item_price) as total_revenue,
+        AVG(total_item_price) AS avg_order_value
+    FROM fact_sales
+    WHERE order_status = :order_status{DATE_FILTER}
+    GROUP BY category
+    ORDER BY total_revenue DESC
+    """,
+        'params': {'order_status': 'delivered', **DATE_RANGE}
+    },
+    'sales_by_city': {
+        'sql': f"""
+    SELECT
+        city,
+        COUNT(DISTINCT customer_id) as unique_customers,
+        COUNT(DISTINCT order_id) as total_orders,
+        SUM(total_item_price) as total_revenue
+    FROM fact_sales
+    WHERE order_status = :order_status{DATE_FILTER}
+    GROUP BY city
+    ORDER BY total_revenue DESC
+    LIMIT :limit
+    """,
+        'params': {'order_status': 'delivered', 'limit': 5, **DATE_RANGE}
+    },
+    'top_customers': {
+        'sql': f"""
+    SELECT
+        customer_name,
+        city,
+        COUNT(DISTINCT order_id) as total_orders,
+        SUM(total_item_price) as total_spent
+    FROM fact_sales
+    WHERE order_status = :order_status{DATE_FILTER}
+    GROUP BY customer_id, customer_name, city
+    ORDER BY total_spent DESC
+    LIMIT :limit
+    """,
+        'params': {'order_status': 'delivered', 'limit': 5, **DATE_RANGE}
+    },
+    'order_status_distribution': {
+        'sql': f"""
+    SELECT
+        order_status,
+        COUNT(DISTINCT order_id) as order_count,
+        ROUND(COUNT(DISTINCT order_id) * 100.0 /
+        (SELECT COUNT(DISTINCT order_id) FROM fact_sales WHERE 1 = 1{DATE_FILTER}), 2) as percentage
+    FROM fact_sales
+    WHERE 1 = 1{DATE_FILTER}
+    GROUP BY order_status
+    ORDER BY order_count DESC
+    """,
+        'params': dict(DATE_RANGE)
+    },
+    'daily_sales_trend': {
+        'sql': f"""
+    SELECT
+        DATE(order_date) as date,
+        COUNT(DISTINCT order_id) as orders,
+        SUM(total_item_price) as revenue
+    FROM fact_sales
+    WHERE order_status = :order_status{DATE_FILTER}
+    GROUP BY DATE(order_date)
+    ORDER BY date DESC
+    LIMIT :limit
+    """,
+        'params': {'order_status': 'delivered', 'limit': 10, **DATE_RANGE}
+    },
+    'summary_metrics': {
+        'sql': f"""
+    SELECT
+        COUNT(DISTINCT order_id) as total_orders,
+        COUNT(DISTINCT customer_id) as total_customers,
+        COUNT(DISTINCT product_id) as total_products,
+        SUM(total_item_price) as total_revenue,
+        AVG(total_item_price) as avg_order_value
+    FROM fact_sales
+    WHERE order_status = :order_status{DATE_FILTER}
+    """,
+        'params': {'order_status': 'delivered', **DATE_RANGE}
+    }
+}
@@ -0,0 +1,162 @@
+import os
+import time
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.json': 'json',
+    '.jsonl': 'json'
+}
+
+
+def _group_digits(magnitude):
+    # Every value is split into the same number of 3-digit groups, joined
+    # with commas and zero-padded; trimming leading '0' and ',' characters
+    # then leaves the usual grouping. All of it runs in Arrow kernels.
+    largest = int(magnitude.max()) if len(magnitude) else 0
+    n_groups = (len(str(largest)) - 1) // 3
+    parts = [pa.array(magnitude // 1000 ** n_groups).cast(pa.string())]
+    for k in range(n_groups - 1, -1, -1):
+        group = pa.array(magnitude // 1000 ** k % 1000).cast(pa.string())
+        parts.append(pc.utf8_lpad(group, width=3, padding='0'))
+    digits = pc.binary_join_element_wise(*parts, ',')
+    digits = pc.utf8_ltrim(digits, characters='0,')
+    return pc.if_else(pc.equal(digits, ''), '0', digits)
+
+
+def _to_series(text, like, na_value):
+    # Results stay Arrow-backed, so no Python string is built per row.
+    if na_value is not None:
+        text = pc.fill_null(text, na_value)
+    return pd.Series(pd.arrays.ArrowExtensionArray(text), index=like.index, name=like.name)
+
+
+def format_thousands(series, decimals=0, prefix='', suffix='', na_value=None):
+    # Vectorized f"{prefix}{x:,.{decimals}f}{suffix}"; missing values become
+    # na_value, or stay missing when it is None.
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    missing = np.isnan(values)
+    filled = np.where(missing, 0, values)
+
+    # Values the int64 path cannot render exactly go through the f-string
+    # instead: infinities, anything past int64 once scaled and, with
+    # decimals, products within rounding error of a .5 tie.
+    scale = 10 ** decimals
+    magnitude = np.abs(filled) * scale
+    fallback = ~np.isfinite(magnitude) | (magnitude >= 2.0 ** 63)
+    if decimals:
+        fallback |= np.abs(magnitude % 1 - 0.5) < 1e-6
+    scaled = np.round(np.where(fallback, 0, magnitude)).astype('int64')
+    text = _group_digits(scaled // scale)
+    if decimals:
+        fraction = pc.utf8_lpad(pa.array(scaled % scale).cast(pa.string()), width=decimals, padding='0')
+        text = pc.binary_join_element_wise(text, fraction, '.')
+
+    # signbit, not < 0, so -0.0 keeps its sign as it does in the f-string.
+    sign = pc.if_else(pa.array(np.signbit(filled)), f"{prefix}-", prefix)
+    text = pc.binary_join_element_wise(sign, text, pa.scalar(suffix), '')
+    if fallback.any():
+        text = pc.replace_with_mask(text, pa.array(fallback), pa.array(
+            [f"{prefix}{value:,.{decimals}f}{suffix}" for value in filled[fallback]], pa.string()
+        ))
+    text = pc.if_else(pa.array(missing), pa.scalar(None, pa.string()), text)
+    return _to_series(text, series, na_value)
+
+
+def format_rupiah(series, na_value='Rp 0'):
+    return format_thousands(series, prefix='Rp ', na_value=na_value)
+
+
+def format_percent(series, na_value='0%'):
+    # Same text as f"{x}%": the shortest repr, with ".0" kept on whole floats.
+    numeric = pd.to_numeric(series, errors='coerce')
+    values = pa.array(numeric, from_pandas=True)
+    text = values.cast(pa.string())
+    if pd.api.types.is_float_dtype(numeric):
+        whole = pc.match_substring_regex(text, r'^-?[0-9]+$')
+        text = pc.if_else(whole, pc.binary_join_element_wise(text, pa.scalar('.0'), ''), text)
+        # Arrow and repr switch to exponent notation at different points;
+        # they agree between 1e-4 and 1e10, and Python renders the rest.
+        floats = numeric.to_numpy(dtype='float64', na_value=np.nan)
+        magnitude = np.abs(floats)
+        fallback = np.isfinite(magnitude) & (magnitude > 0) & ((magnitude < 1e-4) | (magnitude >= 1e10))
+        if fallback.any():
+            text = pc.replace_with_mask(text, pa.array(fallback), pa.array(
+                [repr(value) for value in floats[fallback].tolist()], pa.string()
+            ))
+    text = pc.binary_join_element_wise(text, pa.scalar('%'), '')
+    return _to_series(text, series, na_value)
+
+
+def detect_export_format(path):
+    fmt = EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Cannot infer export format from '{path}'; use one of {sorted(EXPORT_FORMATS)}")
+    return fmt
+
+
+def _write_csv(batches, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for i, batch in enumerate(batches):
+            batch.to_csv(f, index=False, header=i == 0)
+
+
+def _write_json(batches, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for batch in batches:
+            f.write(batch.to_json(orient='records', lines=True, date_format='iso'))
+
+
+def _write_parquet(batches, path):
+    # Each streamed batch becomes one row group, so the writer never holds
+    # more than one batch in memory.
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                table = pa.Table.from_pandas(batch, preserve_index=False)
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = pa.Table.from_pandas(batch, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pq.write_table(pa.table({}), path)
+
+
+def export_query(loader, name, path, fmt=None, batch_size=100_000, **params):
+    fmt = fmt or detect_export_format(path)
+    writers = {'csv': _write_csv, 'json': _write_json, 'parquet': _write_parquet}
+    if fmt not in writers:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    start = time.perf_counter()
+    rows = 0
+
+    def counted(batches):
+        nonlocal rows
+        for batch in batches:
+            rows += len(batch)
+            yield batch
+
+    writers[fmt](counted(loader.stream_query(name, batch_size=batch_size, **params)), path)
+    logger.info(
+        "Exported %s rows of '%s' to %s (%s) in %.3fs",
+        rows, name, path, fmt, time.perf_counter() - start
+    )
+    return rows
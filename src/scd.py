@@ -0,0 +1,119 @@
+import pandas as pd
+import numpy as np
+import logging
+from datetime import datetime
+
+
+logger = logging.getLogger(__name__)
+
+class SCD2Loader:
+    def __init__(self, loader, dimensions, close_missing=False):
+        self.loader = loader
+        self.dimensions = dimensions
+        self.close_missing = close_missing
+        logger.info("SCD2Loader initialized for dimensions: %s", list(dimensions))
+
+    @staticmethod
+    def history_table(dimension):
+        return f"{dimension}_history"
+
+    @staticmethod
+    def row_hashes(df, columns):
+        # Numbers are hashed as float64 so a column that comes back as int
+        # in one run and float in the next does not look like a change.
+        values = df[columns].copy()
+        for col in columns:
+            if pd.api.types.is_numeric_dtype(values[col]):
+                values[col] = values[col].astype('float64')
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        # SQLite integers are signed 64-bit.
+        return hashes.view(np.int64)
+
+    def _table_exists(self, conn, table):
+        cursor = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))
+        return cursor.fetchone() is not None
+
+    def apply(self, dimension, df, effective_at=None):
+        spec = self.dimensions[dimension]
+        key, columns = spec['key'], spec['columns']
+        table = self.history_table(dimension)
+        effective_at = effective_at or datetime.now().isoformat()
+
+        incoming = df[[key] + columns].drop_duplicates(subset=[key]).copy()
+        incoming['row_hash'] = self.row_hashes(incoming, columns)
+
+        stats = {'dimension': dimension, 'inserted': 0, 'changed': 0, 'closed': 0, 'unchanged': 0}
+        conn = self.loader.get_connection()
+        try:
+            # The write lock is taken before the first read: a deferred
+            # transaction that reads and then tries to write while another
+            # connection holds the lock fails at once with "database is locked".
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._table_exists(conn, table):
+                    # Only keys and hashes of current versions are read back, so
+                    # unchanged rows are never compared column by column.
+                    current = pd.read_sql_query(
+                        f"SELECT {key}, row_hash FROM {table} WHERE is_current = 1", conn
+                    )
+                    current_hashes = pd.Series(current['row_hash'].to_numpy(), index=current[key])
+
+                    is_known = incoming[key].isin(current_hashes.index).to_numpy()
+                    is_changed = is_known.copy()
+                    is_changed[is_known] = (
+                        incoming['row_hash'].to_numpy()[is_known]
+                        != current_hashes.reindex(incoming[key].to_numpy()[is_known]).to_numpy()
+                    )
+
+                    to_close = incoming.loc[is_changed, key].tolist()
+                    if self.close_missing:
+                        is_missing = ~current[key].isin(incoming[key])
+                        to_close += current.loc[is_missing, key].tolist()
+
+                    stats['inserted'] = int((~is_known).sum())
+                    stats['changed'] = int(is_changed.sum())
+                    stats['unchanged'] = int(is_known.sum() - is_changed.sum())
+                    stats['closed'] = len(to_close)
+
+                    conn.executemany(
+                        f"UPDATE {table} SET valid_to = ?, is_current = 0 WHERE {key} = ? AND is_current = 1",
+                        [(effective_at, k) for k in to_close]
+                    )
+                    new_rows = incoming[~is_known | is_changed].copy()
+                else:
+                    new_rows = incoming
+                    stats['inserted'] = len(incoming)
+
+                new_rows['valid_from'] = effective_at
+                new_rows['valid_to'] = None
+                new_rows['is_current'] = 1
+                self.loader.insert_rows(new_rows, table, conn)
+                self.loader.adjust_table_stats(table, len(new_rows), conn)
+
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_current ON {table}({key}, is_current)"
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            logger.error("Error applying SCD2 changes to '%s': %s", table, e)
+            raise
+        finally:
+            conn.close()
+
+        logger.info(
+            "SCD2 %s: %s new, %s changed, %s closed, %s unchanged",
+            table, stats['inserted'], stats['changed'], stats['closed'], stats['unchanged']
+        )
+        return stats
+
+    def apply_all(self, frames, effective_at=None):
+        effective_at = effective_at or datetime.now().isoformat()
+        return [
+            self.apply(dimension, frames[dimension], effective_at=effective_at)
+            for dimension in self.dimensions
+            if dimension in frames
+        ]
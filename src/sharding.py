@@ -0,0 +1,135 @@
+import pandas as pd
+import numpy as np
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from src.transform import DataTransformer
+from src.normalize import normalize_keys
+from src.lineage import RowLineage
+
+
+logger = logging.getLogger(__name__)
+
+_worker_state = {}
+
+
+def _init_worker(customers, products, diagnostics, deduplicator=None):
+    # The dimensions are sent once per worker process instead of once per shard.
+    _worker_state['customers'] = customers
+    _worker_state['products'] = products
+    _worker_state['transformer'] = DataTransformer(diagnostics=diagnostics, deduplicator=deduplicator)
+
+
+def _transform_shard(orders, order_items):
+    transformer = _worker_state['transformer']
+    orders = transformer.transform_orders(orders)
+    order_items = transformer.transform_order_items(order_items)
+    fact = transformer.create_fact_sales(
+        orders,
+        order_items,
+        _worker_state['customers'],
+        _worker_state['products']
+    )
+    return orders, order_items, fact, dict(transformer.lineage)
+
+
+class ShardedTransformer:
+    def __init__(self, n_workers=None, n_shards=None, diagnostics=False, transformer=None):
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.n_shards = n_shards or self.n_workers
+        self.diagnostics = diagnostics
+        self.transformer = transformer or DataTransformer(diagnostics=diagnostics)
+        self.prepared_lineage = None
+        logger.info("ShardedTransformer initialized with %s workers, %s shards", self.n_workers, self.n_shards)
+
+    def shard_positions(self, df, key):
+        # Hash the same normalized key create_fact_sales joins on, so rows
+        # that can match (or duplicate each other) land in the same shard.
+        keys = normalize_keys(df[key]).to_numpy(dtype=object)
+        shard_ids = pd.util.hash_array(keys) % np.uint64(self.n_shards)
+
+        # A stable sort keeps the original row order inside every shard,
+        # which preserves drop_duplicates(keep='first') semantics.
+        order = np.argsort(shard_ids, kind='stable')
+        bounds = np.searchsorted(shard_ids[order], np.arange(1, self.n_shards, dtype=np.uint64))
+        return np.split(order, bounds)
+
+    def prepare_order_items(self, df_items):
+        # order_item_id duplicates may carry different order_ids and would
+        # then sit in different shards, so dedup globally before sharding.
+        # This matches the first steps of transform_order_items exactly.
+        lineage = RowLineage(len(df_items))
+        has_keys = df_items[['order_item_id', 'order_id', 'product_id']].notna().all(axis=1).to_numpy()
+        df = lineage.drop(df_items, has_keys, 'missing_key')
+        df = lineage.drop(df, self.transformer.unique_mask(df, ['order_item_id']), 'duplicate')
+        self.prepared_lineage = lineage
+        return df
+
+    def _merge_lineage(self, df_orders, order_parts, item_parts, results):
+        # Shard flags are written back at the rows' positions in the full
+        # inputs, so the lineage matches an unsharded run row for row. The
+        # order item key and duplicate drops happened once, before sharding.
+        orders = RowLineage(len(df_orders))
+        for part, result in zip(order_parts, results):
+            orders.merge(result[3]['transform_orders'], part)
+
+        order_items = self.prepared_lineage
+        prepared_positions = order_items.positions
+        for part, result in zip(item_parts, results):
+            order_items.merge(result[3]['transform_order_items'], prepared_positions[part])
+        return {'transform_orders': orders, 'transform_order_items': order_items}
+
+    def transform_orders_and_facts(self, df_orders, df_order_items, df_customers, df_products):
+        order_parts = self.shard_positions(df_orders, 'order_id')
+        order_shards = [df_orders.iloc[part] for part in order_parts]
+        prepared_items = self.prepare_order_items(df_order_items)
+        item_parts = self.shard_positions(prepared_items, 'order_id')
+        item_shards = [prepared_items.iloc[part] for part in item_parts]
+
+        deduplicator = self.transformer.deduplicator
+        if self.n_workers == 1:
+            _init_worker(df_customers, df_products, self.diagnostics, deduplicator)
+            results = [_transform_shard(o, i) for o, i in zip(order_shards, item_shards)]
+        else:
+            # spawn avoids forking a process that already runs the DAG and
+            # logging threads.
+            with ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(df_customers, df_products, self.diagnostics, deduplicator)
+            ) as executor:
+                results = list(executor.map(_transform_shard, order_shards, item_shards))
+
+        self.transformer.lineage.update(self._merge_lineage(df_orders, order_parts, item_parts, results))
+
+        orders = pd.concat([r[0] for r in results]).sort_index()
+        order_items = pd.concat([r[1] for r in results]).sort_index()
+        fact = pd.concat([r[2] for r in results], ignore_index=True)
+
+        logger.info(
+            "Sharded transform completed: %s orders, %s order items, %s fact rows across %s shards",
+            len(orders), len(order_items), len(fact), self.n_shards
+        )
+        return {'orders': orders, 'order_items': order_items, 'fact_sales': fact}
+
+    def transform_all(self, raw_data):
+        logger.info("Starting sharded transformation of all data")
+        customers = self.transformer.transform_customers(raw_data['customers'])
+        products = self.transformer.transform_products(raw_data['products'])
+
+        sharded = self.transform_orders_and_facts(
+            raw_data['orders'],
+            raw_data['order_items'],
+            customers,
+            products
+        )
+
+        return {
+            'orders': sharded['orders'],
+            'customers': customers,
+            'order_items': sharded['order_items'],
+            'products': products,
+            'fact_sales': sharded['fact_sales']
+        }
@@ -0,0 +1,155 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import contextlib
+import pandas as pd
+from datetime import datetime, timedelta
+
+
+logger = logging.getLogger(__name__)
+
+class SnapshotStore:
+    # Every loaded table version is copied once into its own SQLite file,
+    # named after a digest of its content. A run only adds files for tables
+    # whose content changed; unchanged tables point at the file an earlier
+    # run already wrote, so a snapshot of an unchanged warehouse costs a few
+    # manifest rows.
+    def __init__(self, db_path, snapshot_dir, keep_runs=7, max_age_days=None, index_definitions=None):
+        self.db_path = db_path
+        self.snapshot_dir = snapshot_dir
+        self.keep_runs = keep_runs
+        self.max_age_days = max_age_days
+        self.index_definitions = index_definitions or {}
+        self.manifest_path = os.path.join(snapshot_dir, 'manifest.db')
+
+        os.makedirs(snapshot_dir, exist_ok=True)
+        with self._manifest() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    run_id TEXT,
+                    table_name TEXT,
+                    digest TEXT,
+                    path TEXT,
+                    row_count INTEGER,
+                    created_at TEXT,
+                    PRIMARY KEY (run_id, table_name)
+                )""")
+        logger.info("SnapshotStore initialized with snapshot_dir: %s", snapshot_dir)
+
+    @contextlib.contextmanager
+    def _manifest(self):
+        conn = sqlite3.connect(self.manifest_path)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def table_digest(df):
+        digest = hashlib.sha256()
+        digest.update(str(list(df.columns)).encode())
+        digest.update(str(list(df.dtypes)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()[:32]
+
+    def _copy_table(self, table_name, path):
+        # The copy runs inside SQLite (CREATE TABLE ... AS SELECT from the
+        # freshly loaded table), so no rows pass through Python again.
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("ATTACH DATABASE ? AS snap", (tmp_path,))
+            conn.execute(f"CREATE TABLE snap.{table_name} AS SELECT * FROM main.{table_name}")
+            for index_name, columns in self.index_definitions.get(table_name, {}).items():
+                conn.execute(f"CREATE INDEX snap.{index_name} ON {table_name}({', '.join(columns)})")
+            conn.commit()
+            conn.execute("DETACH DATABASE snap")
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+
+    def create(self, run_id, frames):
+        created_at = datetime.now().isoformat(timespec='seconds')
+        rows, written = [], 0
+        for table_name, df in frames.items():
+            digest = self.table_digest(df)
+            path = os.path.join(self.snapshot_dir, table_name, f"{digest}.db")
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._copy_table(table_name, path)
+                written += 1
+            rows.append((run_id, table_name, digest, os.path.relpath(path, self.snapshot_dir), len(df), created_at))
+
+        # A run id is never reused: replacing its rows would silently point
+        # an earlier run's as_of queries at another run's tables.
+        with self._manifest() as conn:
+            try:
+                conn.executemany("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?)", rows)
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Snapshot for run '{run_id}' already exists") from None
+        logger.info(
+            "Snapshot %s: %s tables, %s new versions, %s reused",
+            run_id, len(rows), written, len(rows) - written
+        )
+        self.evict()
+        return {table: digest for _, table, digest, *_ in rows}
+
+    def runs(self):
+        with self._manifest() as conn:
+            return pd.read_sql_query(
+                "SELECT run_id, MIN(created_at) AS created_at, COUNT(*) AS tables, SUM(row_count) AS row_count "
+                "FROM snapshots GROUP BY run_id ORDER BY run_id",
+                conn
+            )
+
+    def resolve(self, as_of):
+        with self._manifest() as conn:
+            rows = conn.execute(
+                "SELECT table_name, path FROM snapshots WHERE run_id = ?", (as_of,)
+            ).fetchall()
+        if not rows:
+            raise KeyError(f"No snapshot for run '{as_of}'")
+        return {table_name: os.path.join(self.snapshot_dir, path) for table_name, path in rows}
+
+    def connect(self, as_of):
+        # Each table version is attached under its own schema name; SQLite
+        # resolves unqualified table names through attached databases, so
+        # the usual queries run unchanged against the old run.
+        conn = sqlite3.connect(':memory:', uri=True, check_same_thread=False)
+        for table_name, path in self.resolve(as_of).items():
+            conn.execute("ATTACH DATABASE ? AS ?", (f"file:{path}?mode=ro", f"snap_{table_name}"))
+        return conn
+
+    def evict(self):
+        with self._manifest() as conn:
+            run_ids = [row[0] for row in conn.execute(
+                "SELECT run_id, MIN(created_at) FROM snapshots GROUP BY run_id ORDER BY run_id DESC"
+            )]
+            expired = set(run_ids[self.keep_runs:]) if self.keep_runs else set()
+            if self.max_age_days is not None:
+                cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat(timespec='seconds')
+                expired.update(row[0] for row in conn.execute(
+                    "SELECT DISTINCT run_id FROM snapshots WHERE created_at < ?", (cutoff,)
+                ))
+            if expired:
+                conn.executemany("DELETE FROM snapshots WHERE run_id = ?", [(run_id,) for run_id in expired])
+            referenced = {row[0] for row in conn.execute("SELECT DISTINCT path FROM snapshots")}
+
+        # A table file is only removed once no remaining run points at it.
+        removed = 0
+        for table_name in os.listdir(self.snapshot_dir):
+            table_dir = os.path.join(self.snapshot_dir, table_name)
+            if not os.path.isdir(table_dir):
+                continue
+            for name in os.listdir(table_dir):
+                if name.endswith('.db') and os.path.join(table_name, name) not in referenced:
+                    os.remove(os.path.join(table_dir, name))
+                    removed += 1
+        if expired or removed:
+            logger.info("Evicted %s snapshot runs, %s table versions", len(expired), removed)
+        return sorted(expired)
+
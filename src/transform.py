@@ -2,95 +2,178 @@ import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime
+from src.cache import cached_transform
+from src.dates import DateParser
+from src.normalize import normalize_strings, normalize_keys
+from src.lineage import RowLineage
 
 
 logger = logging.getLogger(__name__)
 
 class DataTransformer:
-    def __init__(self):
-        logger.info("DataTransformer initialized")
+    CACHE_VERSION = 1
+
+    def __init__(self, cache=None, diagnostics=False, deduplicator=None):
+        self.cache = cache
+        self.diagnostics = diagnostics
+        self.deduplicator = deduplicator
+        self.date_parser = DateParser()
+        self.lineage = {}
+        logger.info(
+            "DataTransformer initialized (diagnostics=%s, dedup=%s)",
+            diagnostics, 'external' if deduplicator else 'memory'
+        )
+
+    def deduplicate(self, df, subset):
+        # Same result as drop_duplicates(keep='first'); the external mode
+        # sorts and merges spilled runs instead of hashing every key in memory.
+        if self.deduplicator is None:
+            return df.drop_duplicates(subset=subset)
+        return self.deduplicator.drop_duplicates(df, subset)
+
+    def unique_mask(self, df, subset):
+        # True for the rows deduplicate() would keep.
+        if self.deduplicator is None:
+            return ~df.duplicated(subset=subset).to_numpy()
+        return self.deduplicator.unique_mask(df, subset)
+
+    def _start_lineage(self, name, df):
+        # Why each input row was dropped, recorded for the latest call of
+        # every transform; the pipeline stores it with the run so dropped
+        # rows can be investigated without re-running anything.
+        self.lineage[name] = RowLineage(len(df))
+        return self.lineage[name]
+
+    def collect_rejected(self, raw_data):
+        # Rows dropped by the last run of each transform, cut out of its raw
+        # input with one take per table; source_row matches the positions in
+        # the stored row lineage. Works after cache hits, sharded runs and
+        # resumed runs, which all restore or rebuild the lineage; without it
+        # the rejects cannot be told apart, so that is an error.
+        sources = {
+            'orders': 'transform_orders',
+            'customers': 'transform_customers',
+            'order_items': 'transform_order_items',
+            'products': 'transform_products'
+        }
+        rejected = {}
+        for table, transform in sources.items():
+            lineage = self.lineage.get(transform)
+            raw = raw_data.get(table)
+            if raw is None:
+                continue
+            if lineage is None:
+                raise ValueError(f"No row lineage for {transform}; cannot quarantine rejected {table} rows")
+            if len(raw) != len(lineage):
+                raise ValueError(
+                    f"Row lineage for {transform} covers {len(lineage)} rows, but raw {table} has {len(raw)}"
+                )
+            positions, reasons = lineage.dropped()
+            rows = raw.iloc[positions].reset_index(drop=True)
+            rows.insert(0, 'reject_reason', reasons)
+            rows.insert(1, 'source_row', positions)
+            rejected[table] = rows
+            logger.info("Quarantined %s rejected %s rows", len(rows), table)
+        return rejected
+
+    def _flag_bad_dates(self, lineage, raw, parsed):
+        lineage.flag((parsed.isna() & raw.notna()).to_numpy(), 'bad_date')
+
+    @cached_transform
     def transform_orders(self, df_orders):
         logger.info("Transforming orders data...")
         df = df_orders.copy()
 
+        lineage = self._start_lineage('transform_orders', df)
         initial_rows = len(df)
-        df = df.dropna(subset = ['order_id'])
+        df = lineage.drop(df, df['order_id'].notna().to_numpy(), 'missing_key')
         df['customer_id'] = df['customer_id'].fillna('UNKNOWN')
         df['order_status'].fillna('unknown', inplace=True)
         df['total_amount'] = df['total_amount'].fillna(0)
 
-        logger.info(f"Dropped {initial_rows - len(df)} rows due to missing critical data")
+        logger.info("Dropped %s rows due to missing critical data", initial_rows - len(df))
 
-        df['order_date']= pd.to_datetime(df['order_date'], errors='coerce')
+        raw_dates = df['order_date']
+        df['order_date']= self.date_parser.parse(raw_dates)
+        self._flag_bad_dates(lineage, raw_dates, df['order_date'])
         df['total_amount']= pd.to_numeric(df['total_amount'], errors='coerce').fillna(0)
 
         initial_rows = len(df)
-        df = df.drop_duplicates(subset=['order_id'])
-        logger.info(f"Removed {initial_rows - len(df)} duplicate orders")
+        df = lineage.drop(df, self.unique_mask(df, ['order_id']), 'duplicate')
+        logger.info("Removed %s duplicate orders", initial_rows - len(df))
 
         df['order_year'] = df['order_date'].dt.year
         df['order_month'] = df['order_date'].dt.month
         df['order_day'] = df['order_date'].dt.day
-        df['order_day_name'] = df['order_date'].dt.day_name()
+        df['order_day_name'] = self.date_parser.day_names(df['order_date'])
 
-        df['order_status'] = df['order_status'].str.lower().str.strip()
+        df['order_status'] = normalize_strings(df['order_status'], 'lower', 'strip')
 
-        df = df[df['total_amount']>= 0]
+        df = lineage.drop(df, (df['total_amount']>= 0).to_numpy(), 'negative_amount')
 
-        logger.info(f"Orders transformation completed: {len(df)} rows")
+        logger.info("Orders transformation completed: %s rows", len(df))
         return df
 
+    @cached_transform
     def transform_customers(self, df_customers):
         logger.info("Transforming customers data...")
         df = df_customers.copy()
 
+        lineage = self._start_lineage('transform_customers', df)
         df['email'].fillna('no-email@unknown.com', inplace=True)
-        df = df.dropna(subset=['customer_id'])
+        df = lineage.drop(df, df['customer_id'].notna().to_numpy(), 'missing_key')
 
 
-        df['customer_name'] = df['customer_name'].str.title()
-        df['city'] = df['city'].str.title()
-        df['email'] = df['email'].str.lower()
+        df['customer_name'] = normalize_strings(df['customer_name'], 'title')
+        df['city'] = normalize_strings(df['city'], 'title')
+        df['email'] = normalize_strings(df['email'], 'lower')
 
 
-        df['registration_date'] = pd.to_datetime(df['registration_date'], errors='coerce')
+        raw_dates = df['registration_date']
+        df['registration_date'] = self.date_parser.parse(raw_dates)
+        self._flag_bad_dates(lineage, raw_dates, df['registration_date'])
 
         initial_rows = len(df)
-        df = df.drop_duplicates(subset=['customer_id'])
-        logger.info(f"Removed {initial_rows - len(df)} duplicate customers")
+        df = lineage.drop(df, self.unique_mask(df, ['customer_id']), 'duplicate')
+        logger.info("Removed %s duplicate customers", initial_rows - len(df))
 
         df['registration_year'] = df['registration_date'].dt.year
         df['registration_month'] = df['registration_date'].dt.month
 
-        logger.info(f"Customers transformation completed: {len(df)} rows")
+        logger.info("Customers transformation completed: %s rows", len(df))
         return df
 
+    @cached_transform
     def transform_order_items(self, df_items):
         logger.info("Transforming order items data...")
         df = df_items.copy()
 
-        df = df.dropna(subset=['order_item_id', 'order_id', 'product_id'])
+        lineage = self._start_lineage('transform_order_items', df)
+        has_keys = df[['order_item_id', 'order_id', 'product_id']].notna().all(axis=1).to_numpy()
+        df = lineage.drop(df, has_keys, 'missing_key')
 
         df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce').fillna(0)
         df['price_per_unit'] = pd.to_numeric(df['price_per_unit'], errors='coerce').fillna(0)
 
         initial_rows = len(df)
-        df = df.drop_duplicates(subset=['order_item_id'])
-        logger.info(f"Removed {initial_rows - len(df)} duplicate order items")
+        df = lineage.drop(df, self.unique_mask(df, ['order_item_id']), 'duplicate')
+        logger.info("Removed %s duplicate order items", initial_rows - len(df))
 
         df['total_item_price'] = df['quantity'] * df['price_per_unit']
 
-        df = df[df['quantity'] >= 0]
-        df = df[df['price_per_unit'] >= 0]
+        df = lineage.drop(df, (df['quantity'] >= 0).to_numpy(), 'negative_quantity')
+        df = lineage.drop(df, (df['price_per_unit'] >= 0).to_numpy(), 'negative_price')
 
-        logger.info(f"Order items transformation completed: {len(df)} rows")
+        logger.info("Order items transformation completed: %s rows", len(df))
         return df
 
+    @cached_transform
     def transform_products(self, df_products):
         logger.info("Transforming products data...")
         df = df_products.copy()
 
-        df = df.dropna(subset=['product_id'])
+        lineage = self._start_lineage('transform_products', df)
+        df = lineage.drop(df, df['product_id'].notna().to_numpy(), 'missing_key')
         df['product_name'].fillna('Unknown Product', inplace=True)
         df['category'].fillna('Uncategorized', inplace=True)
 
@@ -99,20 +182,21 @@ class DataTransformer:
         df['stock'] = pd.to_numeric(df['stock'], errors='coerce').fillna(0)
         
 
-        df['product_name'] = df['product_name'].str.title()
-        df['category'] = df['category'].str.title()
+        df['product_name'] = normalize_strings(df['product_name'], 'title')
+        df['category'] = normalize_strings(df['category'], 'title')
         
 
         initial_rows = len(df)
-        df = df.drop_duplicates(subset=['product_id'])
-        logger.info(f"Removed {initial_rows - len(df)} duplicate products")
+        df = lineage.drop(df, self.unique_mask(df, ['product_id']), 'duplicate')
+        logger.info("Removed %s duplicate products", initial_rows - len(df))
 
-        logger.info(f"Products transformation completed: {len(df)} rows")
+        logger.info("Products transformation completed: %s rows", len(df))
         return df
 
     def create_fact_sales(self, df_orders, df_order_items, df_customers, df_products):
         logger.info("Creating fact_sales table...")
-        print("DEBUG Orders Head:\n", df_orders[['order_id', 'customer_id']].head())
+        if self.diagnostics:
+            logger.info("Diagnostics - orders head:\n%s", df_orders[['order_id', 'customer_id']].head())
 
         df_orders = df_orders.copy()
         df_order_items = df_order_items.copy()
@@ -120,11 +204,11 @@ class DataTransformer:
         df_products = df_products.copy()
 
         for df in [df_orders, df_customers]:
-            df["customer_id"] = df['customer_id'].astype(str).str.strip()
+            df["customer_id"] = normalize_keys(df['customer_id'])
         for df in [df_orders, df_order_items]:
-            df["order_id"] = df['order_id'].astype(str).str.strip()
+            df["order_id"] = normalize_keys(df['order_id'])
         for df in [df_order_items, df_products]:
-            df["product_id"] = df['product_id'].astype(str).str.strip()
+            df["product_id"] = normalize_keys(df['product_id'])
        
 
         try:
@@ -132,9 +216,9 @@ class DataTransformer:
             available_cols = [col for col in required_cols if col in df_customers.columns]
 
             if not available_cols:
-                logger.error(f"No matching columns found in df_customers!")
-                logger.error(f"Required: {required_cols}")
-                logger.error(f"Available: {list(df_customers.columns)}")
+                logger.error("No matching columns found in df_customers!")
+                logger.error("Required: %s", required_cols)
+                logger.error("Available: %s", list(df_customers.columns))
                 raise ValueError("Cannot create fact table: missing customer columns")
 
             fact = df_orders.merge(
@@ -142,10 +226,11 @@ class DataTransformer:
                 on='customer_id',
                 how= 'left'
             )
-            logger.info(f"Joined with customers: {len(fact)} rows")
-            logger.info(f"Customer NULLs: {fact['customer_name'].isna().sum()}")
+            logger.info("Joined with customers: %s rows", len(fact))
+            if self.diagnostics:
+                logger.info("Customer NULLs: %s", fact['customer_name'].isna().sum())
         except Exception as e:
-            logger.error(f"error joining with customers: {str(e)}")
+            logger.error("error joining with customers: %s", e)
             raise
 
         
@@ -158,10 +243,11 @@ class DataTransformer:
                 on='order_id',
                 how= 'left'
             )
-            logger.info(f"Joined with order_items: {len(fact)} rows")
-            logger.info(f"product NULLs: {fact['product_id'].isna().sum()}")
+            logger.info("Joined with order_items: %s rows", len(fact))
+            if self.diagnostics:
+                logger.info("product NULLs: %s", fact['product_id'].isna().sum())
         except Exception as e:
-            logger.error(f"error joining with order_items: {str(e)}")
+            logger.error("error joining with order_items: %s", e)
             raise
 
         try:
@@ -173,10 +259,11 @@ class DataTransformer:
                 on='product_id',
                 how= 'left'
             )
-            logger.info(f"Joined with products: {len(fact)} rows")
-            logger.info(f"category NULLs: {fact['category'].isna().sum()}")
+            logger.info("Joined with products: %s rows", len(fact))
+            if self.diagnostics:
+                logger.info("category NULLs: %s", fact['category'].isna().sum())
         except Exception as e:
-            logger.error(f"error joining with products: {str(e)}")
+            logger.error("error joining with products: %s", e)
             raise
 
         try:
@@ -190,19 +277,18 @@ class DataTransformer:
 
             final_columns = [col for col in desired_columns if col in fact.columns]
 
-            logger.info(f"Final columns selected: {final_columns}")
+            logger.info("Final columns selected: %s", final_columns)
 
             fact = fact[final_columns]
 
         except Exception as e:
-            logger.error(f"Error selecting final columns: {str(e)}")
-            logger.error(f"Available columns: {list(fact.columns)}")
+            logger.error("Error selecting final columns: %s", e)
+            logger.error("Available columns: %s", list(fact.columns))
             raise
 
-        logger.info(f"Fact sales table created: {len(fact)} rows, {len(fact.columns)} columns")
-        # Tambahkan ini sebelum 'return fact' di fungsi create_fact_sales
-        print(f"DEBUG: Jumlah baris di fact_sales: {len(fact)}")
-        print(f"DEBUG: Baris dengan total_item_price > 0: {len(fact[fact['total_item_price'] > 0])}")
+        logger.info("Fact sales table created: %s rows, %s columns", len(fact), len(fact.columns))
+        if self.diagnostics:
+            logger.info("Diagnostics - rows with total_item_price > 0: %s", int((fact['total_item_price'] > 0).sum()))
         return fact
 
     def transform_all(self, raw_data):
@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from benchmarks.synthetic_data import SyntheticDataGenerator
+
+
+@pytest.fixture(scope='session')
+def raw_data():
+    # Small but dirty: duplicates, missing keys, bad dates and negative
+    # amounts all show up at these rates.
+    generator = SyntheticDataGenerator(2000, seed=7, duplicate_rate=0.05, dirty_rate=0.05)
+    return {
+        'orders': generator.generate_orders(0, 0, generator.n_orders),
+        'customers': generator.generate_customers(0, 0, generator.n_customers),
+        'order_items': generator.generate_order_items(0, 0, generator.n_order_items),
+        'products': generator.generate_products(0, 0, generator.n_products)
+    }
@@ -0,0 +1,41 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.cache import TransformCache
+from src.external_dedup import ExternalDeduplicator
+from src.transform import DataTransformer
+
+
+def test_code_version_covers_transform_dependencies(tmp_path):
+    modules = TransformCache.source_modules(DataTransformer())
+    assert {'src.transform', 'src.dates', 'src.normalize', 'src.lineage', 'src.cache'} <= set(modules)
+
+    external = DataTransformer(deduplicator=ExternalDeduplicator(str(tmp_path / 'spill')))
+    assert 'src.external_dedup' in TransformCache.source_modules(external)
+
+
+def test_cache_hit_restores_result_and_lineage(tmp_path, raw_data):
+    cache = TransformCache(str(tmp_path / 'cache'))
+    first = DataTransformer(cache=cache)
+    expected = first.transform_orders(raw_data['orders'])
+
+    second = DataTransformer(cache=cache)
+    pd.testing.assert_frame_equal(second.transform_orders(raw_data['orders']), expected)
+    np.testing.assert_array_equal(second.lineage['transform_orders'].flags, first.lineage['transform_orders'].flags)
+    assert cache.stats() == {'hits': 1, 'misses': 1}
+
+
+def test_corrupt_entry_is_evicted_and_recomputed(tmp_path, raw_data):
+    cache_dir = tmp_path / 'cache'
+    cache = TransformCache(str(cache_dir))
+    expected = DataTransformer(cache=cache).transform_products(raw_data['products'])
+
+    (entry,) = [path for path in cache_dir.iterdir() if path.suffix == '.pkl']
+    entry.write_bytes(b'not a pickle')
+
+    result = DataTransformer(cache=cache).transform_products(raw_data['products'])
+    pd.testing.assert_frame_equal(result, expected)
+    assert cache.stats() == {'hits': 0, 'misses': 2}
+    assert os.path.getsize(entry) > len(b'not a pickle')
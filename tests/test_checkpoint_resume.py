@@ -0,0 +1,115 @@
+import pandas as pd
+import pytest
+
+from src.checkpoint import CheckpointManager
+from src.orchestrator import PipelineDAG
+
+
+class Recorder:
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    def task(self, name, value=None):
+        def run(*args):
+            self.calls.append(name)
+            if name in self.fail:
+                raise RuntimeError(f"{name} failed")
+            return value
+        return run
+
+
+def build_dag(checkpoint, recorder, resume):
+    dag = PipelineDAG(max_workers=2, checkpoint=checkpoint, resume=resume)
+    dag.add_task('extract', recorder.task('extract', pd.DataFrame({'id': [1, 2, 3]})))
+    dag.add_task('transform', recorder.task('transform', pd.DataFrame({'id': [1, 2]})), inputs=['extract'])
+    dag.add_task('load', recorder.task('load'), inputs=['transform'], side_effect=True)
+    dag.add_task('create_indexes', recorder.task('create_indexes'), depends_on=['load'], side_effect=True)
+    return dag
+
+
+@pytest.fixture
+def checkpoint_dir(tmp_path):
+    return str(tmp_path / 'checkpoints')
+
+
+def test_resume_after_failure_skips_completed_tasks(checkpoint_dir):
+    failing = Recorder(fail={'create_indexes'})
+    with pytest.raises(RuntimeError):
+        build_dag(CheckpointManager(checkpoint_dir, 'abc'), failing, resume=False).run()
+    assert failing.calls == ['extract', 'transform', 'load', 'create_indexes']
+
+    resumed = Recorder()
+    build_dag(CheckpointManager(checkpoint_dir, 'abc'), resumed, resume=True).run()
+    assert resumed.calls == ['create_indexes']
+
+
+def test_resume_restores_inputs_of_rerun_tasks(checkpoint_dir):
+    with pytest.raises(RuntimeError):
+        build_dag(CheckpointManager(checkpoint_dir, 'abc'), Recorder(fail={'load'}), resume=False).run()
+
+    resumed = Recorder()
+    dag = build_dag(CheckpointManager(checkpoint_dir, 'abc'), resumed, resume=True)
+    results = dag.run()
+    assert resumed.calls == ['load', 'create_indexes']
+    assert dag.tasks['transform'].status == 'restored'
+    assert results['transform']['id'].tolist() == [1, 2]
+
+
+def test_resume_after_finished_run_reruns_side_effects(checkpoint_dir):
+    build_dag(CheckpointManager(checkpoint_dir, 'abc'), Recorder(), resume=False).run()
+
+    # The warehouse may have changed since the finished run, so a failing
+    # load must fail the resumed run instead of being skipped.
+    resumed = Recorder(fail={'load'})
+    with pytest.raises(RuntimeError):
+        build_dag(CheckpointManager(checkpoint_dir, 'abc'), resumed, resume=True).run()
+    assert resumed.calls == ['load']
+
+
+def test_fresh_run_discards_previous_checkpoints(checkpoint_dir):
+    with pytest.raises(RuntimeError):
+        build_dag(CheckpointManager(checkpoint_dir, 'abc'), Recorder(fail={'load'}), resume=False).run()
+
+    fresh = Recorder(fail={'transform'})
+    with pytest.raises(RuntimeError):
+        build_dag(CheckpointManager(checkpoint_dir, 'abc'), fresh, resume=False).run()
+
+    resumed = Recorder()
+    build_dag(CheckpointManager(checkpoint_dir, 'abc'), resumed, resume=True).run()
+    assert resumed.calls == ['transform', 'load', 'create_indexes']
+
+
+def test_fingerprint_tracks_size_and_mtime(tmp_path):
+    path = tmp_path / 'orders.csv'
+    path.write_text('order_id\n1\n')
+    before = CheckpointManager.fingerprint_files([str(path)])
+    assert CheckpointManager.fingerprint_files([str(path)]) == before
+
+    path.write_text('order_id\n1\n2\n')
+    assert CheckpointManager.fingerprint_files([str(path)]) != before
+
+
+def test_task_state_is_restored_with_checkpoint(checkpoint_dir):
+    def build(recorder, store):
+        dag = PipelineDAG(max_workers=1, checkpoint=CheckpointManager(checkpoint_dir, 'abc'), resume=True)
+
+        def transform(df):
+            recorder.calls.append('transform')
+            store['transform'] = len(df)
+            return df
+
+        dag.add_task('extract', recorder.task('extract', pd.DataFrame({'id': [1, 2, 3]})))
+        dag.add_task(
+            'transform', transform, inputs=['extract'],
+            state=(lambda: {'transform': store['transform']}, store.update)
+        )
+        dag.add_task('load', recorder.task('load'), inputs=['transform'], side_effect=True)
+        return dag
+
+    build(Recorder(), {}).run()
+
+    resumed, store = Recorder(), {}
+    build(resumed, store).run()
+    assert resumed.calls == ['load']
+    assert store == {'transform': 3}
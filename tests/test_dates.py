@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dates import DateParser
+
+
+def reference(values, fmt):
+    return pd.to_datetime(values.astype(object), format=fmt, errors='coerce')
+
+
+@pytest.mark.parametrize('fmt', ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%m-%d-%Y', '%Y%m%d', '%Y-%m-%d %H:%M:%S'])
+def test_parse_matches_row_wise_to_datetime(fmt):
+    dates = pd.Series(pd.date_range('2024-01-01', periods=60, freq='37h')).dt.strftime(fmt)
+    values = pd.concat([dates, dates.iloc[:20], pd.Series(['not-a-date', None, '', np.nan])], ignore_index=True)
+
+    parsed = DateParser().parse(values.rename('order_date'))
+    expected = pd.Series(reference(values, fmt), name='order_date')
+    pd.testing.assert_series_equal(parsed, expected, check_dtype=False)
+
+
+def test_detects_day_first_format():
+    values = pd.Series(['13/01/2024', '02/03/2024', '31/12/2023'])
+    assert DateParser().detect_format(values) == '%d/%m/%Y'
+
+
+@pytest.mark.parametrize('values', [
+    ['05/06/2024', '07/08/2024', '01/02/2024'],
+    ['05-06-2024', '07-08-2024', '01-02-2024']
+])
+def test_ambiguous_day_month_order_keeps_pandas_reading(values):
+    # Every day is <= 12, so the sample cannot settle the order; pandas
+    # reads such dates month-first and so must the detected format.
+    values = pd.Series(values, name='order_date')
+    expected = pd.to_datetime(values)
+    pd.testing.assert_series_equal(DateParser().parse(values), expected, check_dtype=False)
+    assert DateParser.day_names(DateParser().parse(values)).tolist() == expected.dt.day_name().tolist()
+
+
+def test_redetects_when_source_switches_format():
+    parser = DateParser()
+    parser.parse(pd.Series(['2024-01-05', '2024-02-06'], name='order_date'))
+    parsed = parser.parse(pd.Series(['05/01/2024', '16/02/2024'], name='order_date'))
+    assert parsed.tolist() == [pd.Timestamp('2024-01-05'), pd.Timestamp('2024-02-16')]
+
+
+def test_day_names_match_pandas():
+    dates = pd.Series(pd.to_datetime(['2024-01-01', None, '2024-01-06', '2024-03-10']))
+    pd.testing.assert_series_equal(DateParser.day_names(dates), dates.dt.day_name(), check_dtype=False)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.external_dedup import ExternalDeduplicator
+from src.transform import DataTransformer
+
+
+@pytest.fixture
+def deduplicator(tmp_path):
+    # Tiny chunks and merge batches, so duplicates meet across runs and
+    # merge rounds rather than inside one sorted chunk.
+    return ExternalDeduplicator(str(tmp_path / 'spill'), chunk_rows=3, merge_batch_rows=2)
+
+
+MIXED = pd.DataFrame({
+    'key': [1, '1', 1.0, None, np.nan, None, True, 'a', pd.NA, 'a', 0, False, np.nan, pd.NaT, 2.5, '2.5'],
+    'other': ['x', 'x', 'x', 'y', 'y', np.nan, 'x', 'z', 'y', 'z', 'w', 'w', np.nan, 'y', 'v', 'v']
+})
+
+
+@pytest.mark.parametrize('subset', [['key'], ['other'], ['key', 'other'], ['other', 'key']])
+def test_matches_drop_duplicates_on_mixed_types(deduplicator, subset):
+    expected = MIXED.drop_duplicates(subset=subset)
+    pd.testing.assert_frame_equal(deduplicator.drop_duplicates(MIXED, subset), expected)
+
+
+def test_matches_drop_duplicates_on_typed_columns(deduplicator):
+    df = pd.DataFrame({
+        'i': [3, 1, 3, 2, 1, 3, 2],
+        'f': [0.1, -0.0, 0.1, 0.0, np.nan, np.nan, 1e20],
+        'd': pd.to_datetime(['2024-01-01', None, '2024-01-01', None, '2024-01-02', '2024-01-02', '2024-01-01']),
+        's': ['a|b', 'a', 'a|b', 'a', 'b', None, 'a']
+    })
+    for subset in (['i'], ['f'], ['d'], ['s'], ['i', 'f'], ['s', 'd'], ['i', 'f', 'd', 's']):
+        pd.testing.assert_frame_equal(deduplicator.drop_duplicates(df, subset), df.drop_duplicates(subset=subset))
+
+
+def test_key_columns_do_not_run_together(deduplicator):
+    df = pd.DataFrame({'a': ['x:', 'x'], 'b': ['y', ':y']})
+    assert deduplicator.unique_mask(df, ['a', 'b']).tolist() == [True, True]
+
+
+def test_chunk_iterator_input(deduplicator):
+    df = pd.DataFrame({'id': [5, 1, 5, 2, 1, 7, 2, 5], 'n': range(8)})
+    chunks = (df.iloc[start:start + 3] for start in range(0, len(df), 3))
+    pd.testing.assert_frame_equal(deduplicator.drop_duplicates(chunks, ['id']), df.drop_duplicates(subset=['id']))
+
+
+def test_external_mode_transforms_match_memory_mode(tmp_path, raw_data):
+    memory = DataTransformer()
+    external = DataTransformer(
+        deduplicator=ExternalDeduplicator(str(tmp_path / 'spill'), chunk_rows=200, merge_batch_rows=50)
+    )
+    for method in ('transform_orders', 'transform_customers', 'transform_order_items', 'transform_products'):
+        table = method.replace('transform_', '')
+        expected = getattr(memory, method)(raw_data[table])
+        pd.testing.assert_frame_equal(getattr(external, method)(raw_data[table]), expected)
+        np.testing.assert_array_equal(external.lineage[method].flags, memory.lineage[method].flags)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.lineage import DROP_MASK, RowLineage
+from src.transform import DataTransformer
+
+
+def random_lineage(n, seed):
+    rng = np.random.default_rng(seed)
+    lineage = RowLineage(n)
+    df = pd.DataFrame({'value': rng.integers(0, 100, n)})
+    lineage.flag(rng.random(n) < 0.05, 'bad_date')
+    df = lineage.drop(df, (df['value'] > 3).to_numpy(), 'missing_key')
+    df = lineage.drop(df, ~df['value'].duplicated().to_numpy() | (rng.random(len(df)) < 0.5), 'duplicate')
+    lineage.drop(df, (df['value'] < 97).to_numpy(), 'negative_amount')
+    return lineage
+
+
+@pytest.mark.parametrize('n', [0, 1, 7, 5000])
+def test_run_length_encoding_round_trips(n):
+    lineage = random_lineage(n, seed=n)
+    decoded = RowLineage.decode(lineage.encode())
+
+    np.testing.assert_array_equal(decoded.flags, lineage.flags)
+    np.testing.assert_array_equal(decoded.positions, lineage.positions)
+    assert decoded.reasons == lineage.reasons
+    assert decoded.counts() == lineage.counts()
+
+
+def test_every_dropped_row_has_one_drop_reason():
+    lineage = random_lineage(5000, seed=1)
+    positions, reasons = lineage.dropped()
+    for reason in ('missing_key', 'duplicate', 'negative_amount'):
+        np.testing.assert_array_equal(positions[reasons == reason], lineage.rows_with(reason))
+    drop_bits = lineage.flags & DROP_MASK
+    assert not np.any(drop_bits & (drop_bits - 1))
+
+
+def test_transform_lineage_explains_every_dropped_row(raw_data):
+    transformer = DataTransformer()
+    for method, table in (('transform_orders', 'orders'), ('transform_order_items', 'order_items')):
+        raw = raw_data[table]
+        result = getattr(transformer, method)(raw)
+        lineage = transformer.lineage[method]
+
+        np.testing.assert_array_equal(lineage.survivors(), result.index.to_numpy())
+        counts = lineage.counts()
+        assert counts['rows_in'] == len(raw)
+        assert counts['rows_out'] == len(result)
+        dropped = sum(count for reason, count in counts.items() if reason not in ('rows_in', 'rows_out', 'bad_date'))
+        assert dropped == len(raw) - len(result)
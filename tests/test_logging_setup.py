@@ -0,0 +1,22 @@
+import logging
+import queue
+import threading
+
+from src.logging_setup import DeferredQueueHandler
+
+
+def test_mutable_args_render_with_values_at_call():
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger('tests.deferred')
+    logger.propagate = False
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    try:
+        stats = {'rows': 1}
+        logger.warning("stats: %s", stats)
+        stats['rows'] = 2
+        logger.warning("lock: %s %s", threading.Lock(), 3)
+    finally:
+        logger.handlers.clear()
+
+    assert log_queue.get_nowait().getMessage() == "stats: {'rows': 1}"
+    assert log_queue.get_nowait().getMessage().endswith(" 3")
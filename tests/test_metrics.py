@@ -0,0 +1,23 @@
+import sqlite3
+
+import pandas as pd
+
+from src.load import DataLoader
+from src.metrics import PipelineMetrics
+
+
+def test_recorded_run_counts_rows_loaded_into_warehouse(tmp_path):
+    db_path = str(tmp_path / 'warehouse.db')
+    metrics = PipelineMetrics()
+    loader = metrics.instrument(DataLoader(db_path), 'load')
+
+    loader.load_all({
+        'orders': pd.DataFrame({'order_id': ['A', 'B', 'C']}),
+        'customers': pd.DataFrame({'customer_id': ['X', 'Y']})
+    })
+    report = metrics.build_report('success')
+    metrics.write_to_warehouse(report, loader)
+
+    with sqlite3.connect(db_path) as conn:
+        rows_loaded = conn.execute("SELECT rows_loaded FROM pipeline_runs").fetchone()[0]
+    assert rows_loaded == 5
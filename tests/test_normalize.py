@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.normalize import map_unique, normalize_keys, normalize_strings
+
+
+def row_wise(series, *operations):
+    for op in operations:
+        series = getattr(series.str, op)()
+    return series
+
+
+LOW_CARDINALITY = pd.Series([' Jakarta', 'BANDUNG ', None, ' Jakarta', np.nan, 'bandung ', 'Medan'] * 50)
+HIGH_CARDINALITY = pd.Series([f" id{i} " for i in range(300)] + [None, np.nan])
+
+
+@pytest.mark.parametrize('series', [LOW_CARDINALITY, HIGH_CARDINALITY], ids=['low', 'high'])
+@pytest.mark.parametrize('operations', [('lower', 'strip'), ('title',), ('upper',)])
+def test_normalize_strings_matches_row_wise(series, operations):
+    series = series.set_axis(range(100, 100 + len(series))).rename('city')
+    expected = row_wise(series, *operations)
+    pd.testing.assert_series_equal(normalize_strings(series, *operations), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('series', [LOW_CARDINALITY, HIGH_CARDINALITY, pd.Series([1, 2, 1, 2.5, None] * 40)])
+def test_normalize_keys_matches_row_wise(series):
+    expected = series.astype(str).str.strip()
+    pd.testing.assert_series_equal(normalize_keys(series), expected, check_dtype=False)
+
+
+def test_map_unique_calls_func_once_per_distinct_value():
+    seen = []
+
+    def func(values):
+        seen.append(len(values))
+        return values.str.upper()
+
+    map_unique(LOW_CARDINALITY, func)
+    assert seen[0] == LOW_CARDINALITY.nunique()
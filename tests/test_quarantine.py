@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+from src.load import DataLoader
+from src.transform import DataTransformer
+
+
+def transform_all(transformer, raw_data):
+    return {
+        'orders': transformer.transform_orders(raw_data['orders']),
+        'customers': transformer.transform_customers(raw_data['customers']),
+        'order_items': transformer.transform_order_items(raw_data['order_items']),
+        'products': transformer.transform_products(raw_data['products'])
+    }
+
+
+def test_rejected_rows_are_exactly_the_dropped_rows(raw_data):
+    transformer = DataTransformer()
+    transformed = transform_all(transformer, raw_data)
+    rejected = transformer.collect_rejected(raw_data)
+
+    for table, raw in raw_data.items():
+        rows = rejected[table]
+        assert len(rows) + len(transformed[table]) == len(raw)
+        assert set(transformed[table].index).isdisjoint(rows['source_row'])
+        assert rows['reject_reason'].notna().all()
+    assert (rejected['orders']['reject_reason'] == 'duplicate').any()
+
+
+def test_rejects_need_lineage(raw_data):
+    with pytest.raises(ValueError, match='No row lineage'):
+        DataTransformer().collect_rejected(raw_data)
+
+
+def test_rejects_need_matching_lineage(raw_data):
+    transformer = DataTransformer()
+    transform_all(transformer, raw_data)
+    truncated = dict(raw_data, orders=raw_data['orders'].iloc[:10])
+    with pytest.raises(ValueError, match='covers'):
+        transformer.collect_rejected(truncated)
+
+
+def test_failed_quarantine_leaves_no_rows(tmp_path, raw_data, monkeypatch):
+    db_path = str(tmp_path / 'warehouse.db')
+    transformer = DataTransformer()
+    transform_all(transformer, raw_data)
+    rejected = transformer.collect_rejected(raw_data)
+    loader = DataLoader(db_path)
+
+    insert_rows = loader.insert_rows
+
+    def failing_insert(df, table_name, conn):
+        if table_name == 'rejected_products':
+            raise sqlite3.OperationalError('disk I/O error')
+        insert_rows(df, table_name, conn)
+
+    monkeypatch.setattr(loader, 'insert_rows', failing_insert)
+    with pytest.raises(sqlite3.OperationalError):
+        loader.load_rejected(rejected, 'run1')
+
+    with sqlite3.connect(db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert not any(name.startswith('rejected_') for name in tables)
+
+    monkeypatch.undo()
+    loaded = loader.load_rejected(rejected, 'run1')
+    assert loaded == {f"rejected_{table}": len(rows) for table, rows in rejected.items() if len(rows)}
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.reporting import format_percent, format_rupiah, format_thousands
+
+VALUES = [
+    0, 0.0, -0.0, 0.4, -0.4, 0.5, 1.5, 2.5, -2.5, 999, 999.5, 1000, -1000, 1234567.89, -9876543210.5,
+    10 ** 15 + 0.5, 9.99e17, -9.99e17, 2.0 ** 63, 1e30, -1e30, np.inf, -np.inf, np.nan, None
+]
+
+
+def rupiah(x):
+    # The row-wise formatter format_rupiah replaces.
+    return f"Rp {x:,.0f}" if pd.notna(x) else "Rp 0"
+
+
+def test_format_rupiah_matches_f_string():
+    series = pd.Series(VALUES, dtype='float64')
+    assert format_rupiah(series).tolist() == series.apply(rupiah).tolist()
+
+
+def test_format_rupiah_on_integer_columns():
+    series = pd.Series([0, 7, -12345, 2 ** 62, -(2 ** 62)], dtype='int64')
+    assert format_rupiah(series).tolist() == series.apply(rupiah).tolist()
+
+
+@pytest.mark.parametrize('decimals', [1, 2, 3])
+def test_format_thousands_with_decimals_matches_f_string(decimals):
+    rng = np.random.default_rng(decimals)
+    values = np.concatenate([
+        rng.normal(0, 1e6, 2000).round(decimals + 1),
+        [1.005, 2.675, 0.125, 1.115, -0.005, 9.99e17, -0.0]
+    ])
+    series = pd.Series(values)
+    expected = [f"{x:,.{decimals}f}" for x in values]
+    assert format_thousands(series, decimals=decimals).tolist() == expected
+
+
+def test_format_percent_matches_f_string():
+    series = pd.Series([12.5, 100.0, 0.0, -0.0, 33.33, np.nan, 1e-05, 1e-08, 0.0001, 2.5e16, 1e15, 9999999999.5, 1e10, np.inf, 1 / 3])
+    expected = series.apply(lambda x: f"{x}%" if pd.notna(x) else "0%")
+    assert format_percent(series).tolist() == expected.tolist()
+
+
+def test_formatters_keep_index_and_name():
+    series = pd.Series([1.0, 2.0], index=[10, 20], name='revenue')
+    result = format_rupiah(series)
+    assert result.index.tolist() == [10, 20] and result.name == 'revenue'
@@ -0,0 +1,85 @@
+import sqlite3
+import threading
+
+import pandas as pd
+import pytest
+
+from src.load import DataLoader
+from src.scd import SCD2Loader
+
+DIMENSIONS = {'products': {'key': 'product_id', 'columns': ['product_name', 'price']}}
+
+
+def naive_history(batches, close_missing):
+    # Row-by-row SCD type 2, compared column by column.
+    history = []
+    for effective_at, df in batches:
+        df = df.drop_duplicates(subset=['product_id'])
+        current = {row['product_id']: row for row in history if row['is_current'] == 1}
+        incoming = set(df['product_id'])
+        for record in df.to_dict('records'):
+            old = current.get(record['product_id'])
+            if old is not None and (old['product_name'], float(old['price'])) == (record['product_name'], float(record['price'])):
+                continue
+            if old is not None:
+                old.update(valid_to=effective_at, is_current=0)
+            history.append({**record, 'valid_from': effective_at, 'valid_to': None, 'is_current': 1})
+        if close_missing:
+            for key, old in current.items():
+                if key not in incoming:
+                    old.update(valid_to=effective_at, is_current=0)
+    return history
+
+
+BATCHES = [
+    ('2024-01-01', pd.DataFrame({'product_id': ['P1', 'P2', 'P3'], 'product_name': ['A', 'B', 'C'], 'price': [10, 20, 30]})),
+    ('2024-01-02', pd.DataFrame({'product_id': ['P1', 'P2', 'P4', 'P4'], 'product_name': ['A', 'B2', 'D', 'D'], 'price': [10.0, 20.0, 40.0, 41.0]})),
+    ('2024-01-03', pd.DataFrame({'product_id': ['P1', 'P2', 'P3'], 'product_name': ['A', 'B2', 'C'], 'price': [11, 20, 30]})),
+]
+
+
+@pytest.mark.parametrize('close_missing', [False, True])
+def test_history_matches_row_by_row_scd2(tmp_path, close_missing):
+    db_path = str(tmp_path / 'warehouse.db')
+    history = SCD2Loader(DataLoader(db_path), DIMENSIONS, close_missing=close_missing)
+    for effective_at, df in BATCHES:
+        history.apply('products', df, effective_at=effective_at)
+
+    with sqlite3.connect(db_path) as conn:
+        actual = pd.read_sql_query(
+            "SELECT product_id, product_name, price, valid_from, valid_to, is_current FROM products_history", conn
+        )
+    expected = pd.DataFrame(naive_history(BATCHES, close_missing))
+
+    def ordered(df):
+        df = df.astype({'price': 'float64', 'is_current': 'int64'})
+        return df.sort_values(['product_id', 'valid_from']).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(ordered(actual), ordered(expected[actual.columns]))
+
+
+def test_type_only_change_is_not_a_new_version(tmp_path):
+    history = SCD2Loader(DataLoader(str(tmp_path / 'warehouse.db')), DIMENSIONS)
+    history.apply('products', BATCHES[0][1], effective_at='2024-01-01')
+    stats = history.apply('products', BATCHES[0][1].astype({'price': 'float64'}), effective_at='2024-01-02')
+    assert stats['unchanged'] == 3 and stats['changed'] == 0
+
+
+def test_apply_waits_for_another_writer(tmp_path):
+    db_path = str(tmp_path / 'warehouse.db')
+    history = SCD2Loader(DataLoader(db_path), DIMENSIONS)
+    history.apply('products', BATCHES[0][1], effective_at='2024-01-01')
+
+    # A deferred transaction that reads first gets "database is locked" at
+    # once when another connection holds the write lock; apply has to wait.
+    other = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    other.execute("INSERT INTO products_history (product_id, is_current) VALUES ('P9', 0)")
+    timer = threading.Timer(0.5, lambda: other.execute("COMMIT"))
+    timer.start()
+    try:
+        stats = history.apply('products', BATCHES[1][1], effective_at='2024-01-02')
+    finally:
+        timer.join()
+        other.close()
+    assert stats['changed'] == 1 and stats['inserted'] == 1
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.external_dedup import ExternalDeduplicator
+from src.sharding import ShardedTransformer
+from src.transform import DataTransformer
+
+
+def unsharded(raw_data):
+    transformer = DataTransformer()
+    customers = transformer.transform_customers(raw_data['customers'])
+    products = transformer.transform_products(raw_data['products'])
+    orders = transformer.transform_orders(raw_data['orders'])
+    order_items = transformer.transform_order_items(raw_data['order_items'])
+    fact = transformer.create_fact_sales(orders, order_items, customers, products)
+    return transformer, {'orders': orders, 'order_items': order_items, 'fact_sales': fact}
+
+
+def sort_fact(fact):
+    return fact.sort_values(list(fact.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('external', [False, True])
+def test_sharded_transform_matches_unsharded(tmp_path, raw_data, external):
+    expected_transformer, expected = unsharded(raw_data)
+
+    deduplicator = ExternalDeduplicator(str(tmp_path / 'spill'), chunk_rows=500) if external else None
+    transformer = DataTransformer(deduplicator=deduplicator)
+    customers = transformer.transform_customers(raw_data['customers'])
+    products = transformer.transform_products(raw_data['products'])
+    sharded = ShardedTransformer(n_workers=1, n_shards=4, transformer=transformer)
+    result = sharded.transform_orders_and_facts(raw_data['orders'], raw_data['order_items'], customers, products)
+
+    pd.testing.assert_frame_equal(result['orders'], expected['orders'])
+    pd.testing.assert_frame_equal(result['order_items'], expected['order_items'])
+    pd.testing.assert_frame_equal(sort_fact(result['fact_sales']), sort_fact(expected['fact_sales']))
+    for name in ('transform_orders', 'transform_order_items'):
+        np.testing.assert_array_equal(transformer.lineage[name].flags, expected_transformer.lineage[name].flags)
+
+
+def test_shard_workers_use_configured_deduplicator(tmp_path, raw_data, monkeypatch):
+    calls = []
+    deduplicator = ExternalDeduplicator(str(tmp_path / 'spill'))
+    unique_mask = deduplicator.unique_mask
+
+    def counting_unique_mask(df, subset):
+        calls.append(subset)
+        return unique_mask(df, subset)
+
+    monkeypatch.setattr(deduplicator, 'unique_mask', counting_unique_mask)
+    transformer = DataTransformer(deduplicator=deduplicator)
+    customers = transformer.transform_customers(raw_data['customers'])
+    products = transformer.transform_products(raw_data['products'])
+    calls.clear()
+
+    ShardedTransformer(n_workers=1, n_shards=2, transformer=transformer).transform_orders_and_facts(
+        raw_data['orders'], raw_data['order_items'], customers, products
+    )
+    # One global order item pass, then orders and order items per shard.
+    assert calls.count(['order_id']) == 2
+    assert calls.count(['order_item_id']) == 3
@@ -0,0 +1,80 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.load import DataLoader
+from src.metrics import PipelineMetrics
+from src.snapshots import SnapshotStore
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    db_path = str(tmp_path / 'warehouse.db')
+    store = SnapshotStore(db_path, str(tmp_path / 'snapshots'), keep_runs=2)
+    return DataLoader(db_path, snapshots=store), store
+
+
+def load_run(loader, store, run_id, frames):
+    loader.load_all(frames)
+    return store.create(run_id, frames)
+
+
+def table_files(store, table_name):
+    return sorted(os.listdir(os.path.join(store.snapshot_dir, table_name)))
+
+
+ORDERS_V1 = pd.DataFrame({'order_id': ['A', 'B'], 'total_amount': [10.0, 20.0]})
+ORDERS_V2 = pd.DataFrame({'order_id': ['A', 'B', 'C'], 'total_amount': [10.0, 25.0, 30.0]})
+ORDERS_V3 = pd.DataFrame({'order_id': ['D'], 'total_amount': [5.0]})
+PRODUCTS = pd.DataFrame({'product_id': ['P1', 'P2'], 'price': [100, 200]})
+
+
+def test_unchanged_table_shares_one_file(warehouse):
+    loader, store = warehouse
+    first = load_run(loader, store, 'run1', {'orders': ORDERS_V1, 'products': PRODUCTS})
+    second = load_run(loader, store, 'run2', {'orders': ORDERS_V2, 'products': PRODUCTS})
+
+    assert first['products'] == second['products']
+    assert table_files(store, 'products') == [f"{first['products']}.db"]
+    assert len(table_files(store, 'orders')) == 2
+    assert store.resolve('run1')['products'] == store.resolve('run2')['products']
+
+
+def test_evicted_files_are_removed_only_when_unreferenced(warehouse):
+    loader, store = warehouse
+    v1 = load_run(loader, store, 'run1', {'orders': ORDERS_V1, 'products': PRODUCTS})
+    load_run(loader, store, 'run2', {'orders': ORDERS_V2, 'products': PRODUCTS})
+    v3 = load_run(loader, store, 'run3', {'orders': ORDERS_V3, 'products': PRODUCTS})
+
+    # keep_runs=2 evicts run1: its orders version goes, the products file
+    # it shares with the remaining runs stays.
+    assert store.runs()['run_id'].tolist() == ['run2', 'run3']
+    assert f"{v1['orders']}.db" not in table_files(store, 'orders')
+    assert table_files(store, 'products') == [f"{v3['products']}.db"]
+    with pytest.raises(KeyError):
+        store.resolve('run1')
+
+
+def test_as_of_query_sees_the_old_table(warehouse):
+    loader, store = warehouse
+    load_run(loader, store, 'run1', {'orders': ORDERS_V1, 'products': PRODUCTS})
+    load_run(loader, store, 'run2', {'orders': ORDERS_V2, 'products': PRODUCTS})
+
+    query = "SELECT order_id, total_amount FROM orders ORDER BY order_id"
+    pd.testing.assert_frame_equal(loader.execute_query(query, as_of='run1'), ORDERS_V1)
+    pd.testing.assert_frame_equal(loader.execute_query(query), ORDERS_V2)
+
+
+def test_run_id_cannot_be_overwritten(warehouse):
+    loader, store = warehouse
+    load_run(loader, store, 'run1', {'orders': ORDERS_V1})
+    with pytest.raises(ValueError, match='already exists'):
+        load_run(loader, store, 'run1', {'orders': ORDERS_V2})
+    pd.testing.assert_frame_equal(
+        loader.execute_query("SELECT * FROM orders", as_of='run1'), ORDERS_V1
+    )
+
+
+def test_run_ids_differ_within_one_second():
+    assert PipelineMetrics().run_id != PipelineMetrics().run_id
@@ -0,0 +1,26 @@
+import sqlite3
+
+import pandas as pd
+
+from src.load import DataLoader
+
+
+def test_stats_follow_upserts_and_appends(tmp_path):
+    db_path = str(tmp_path / 'warehouse.db')
+    loader = DataLoader(db_path)
+    loader.load_dataframe(pd.DataFrame({'id': range(10), 'name': ['a'] * 10}), 'items')
+
+    conn = sqlite3.connect(db_path)
+    try:
+        loader.upsert_dataframe(pd.DataFrame({'id': range(5, 2000), 'name': ['b' * 50] * 1995}), 'items', 'id', conn)
+        conn.commit()
+        expected_size = loader._measure_size('items', conn)
+    finally:
+        conn.close()
+    loader.load_dataframe(pd.DataFrame({'id': [5000], 'name': ['c']}), 'items', if_exists='append')
+
+    stats = loader.get_table_stats().set_index('table_name').loc['items']
+    assert stats['row_count'] == 2001
+    assert stats['column_count'] == 2
+    if expected_size is not None:
+        assert stats['size_bytes'] >= expected_size > 4096